@@ -30,6 +30,11 @@ variable "project_name" {
   type = string
 }
 
+variable "bucket_key_enabled" {
+  type    = bool
+  default = false
+}
+
 # Read role ARNs from Phase 1 outputs
 data "local_file" "prod_outputs" {
   filename = "../prod/outputs.json"
@@ -48,6 +53,8 @@ module "pipeline" {
   tooling_account_id = var.tooling_account_id
   prod_account_id   = var.prod_account_id
   
+  bucket_key_enabled = var.bucket_key_enabled
+  
   # Use role ARNs from Phase 1
   codepipeline_role_arn    = local.prod_outputs.codepipeline_role_arn.value
   cloudformation_role_arn  = local.prod_outputs.cloudformation_role_arn.value
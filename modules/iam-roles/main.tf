@@ -1,3 +1,18 @@
+data "aws_region" "current" {}
+
+locals {
+  # The project's own pipeline plus every generated service pipeline
+  # (scripts/generate_services.py). Services are matched by the names
+  # modules/pipeline gives them, so the inline policies stay the same
+  # size however many services there are.
+  artifact_bucket_arns = [
+    var.artifact_bucket_arn,
+    "arn:aws:s3:::${var.project_name}-*-artifacts-${var.tooling_account_id}",
+  ]
+  service_kms_key_arns = "arn:aws:kms:${data.aws_region.current.name}:${var.tooling_account_id}:key/*"
+  service_kms_alias    = "alias/${var.project_name}-*-artifact-key"
+}
+
 # Role that CodePipeline will assume
 resource "aws_iam_role" "codepipeline_cross_account" {
   name = "CodePipelineCrossAccountRole"
@@ -61,14 +76,14 @@ resource "aws_iam_role_policy" "codepipeline_cross_account_policy" {
           "s3:GetObjectVersion",
           "s3:PutObject"
         ]
-        Resource = "${var.artifact_bucket_arn}/*"
+        Resource = [for arn in local.artifact_bucket_arns : "${arn}/*"]
       },
       {
         Effect = "Allow"
         Action = [
           "s3:ListBucket"
         ]
-        Resource = var.artifact_bucket_arn
+        Resource = local.artifact_bucket_arns
       },
       {
         Effect = "Allow"
@@ -81,6 +96,22 @@ resource "aws_iam_role_policy" "codepipeline_cross_account_policy" {
         ]
         Resource = var.kms_key_arn
       },
+      {
+        Effect = "Allow"
+        Action = [
+          "kms:Encrypt",
+          "kms:Decrypt",
+          "kms:ReEncrypt*",
+          "kms:GenerateDataKey*",
+          "kms:DescribeKey"
+        ]
+        Resource = local.service_kms_key_arns
+        Condition = {
+          "ForAnyValue:StringLike" = {
+            "kms:ResourceAliases" = local.service_kms_alias
+          }
+        }
+      },
       {
         Effect = "Allow"
         Action = [
@@ -93,6 +124,13 @@ resource "aws_iam_role_policy" "codepipeline_cross_account_policy" {
           "cloudformation:GetTemplate"
         ]
         Resource = "arn:aws:cloudformation:*:${var.prod_account_id}:stack/${var.project_name}-*/*"
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "iam:PassRole"
+        ]
+        Resource = aws_iam_role.cloudformation_deployment.arn
       }
     ]
   })
@@ -113,7 +151,7 @@ resource "aws_iam_role_policy" "cloudformation_deployment_policy" {
           "s3:GetObject",
           "s3:GetObjectVersion"
         ]
-        Resource = "${var.artifact_bucket_arn}/*"
+        Resource = [for arn in local.artifact_bucket_arns : "${arn}/*"]
       },
       {
         Effect = "Allow"
@@ -126,6 +164,22 @@ resource "aws_iam_role_policy" "cloudformation_deployment_policy" {
         ]
         Resource = var.kms_key_arn
       },
+      {
+        Effect = "Allow"
+        Action = [
+          "kms:Encrypt",
+          "kms:Decrypt",
+          "kms:ReEncrypt*",
+          "kms:GenerateDataKey*",
+          "kms:DescribeKey"
+        ]
+        Resource = local.service_kms_key_arns
+        Condition = {
+          "ForAnyValue:StringLike" = {
+            "kms:ResourceAliases" = local.service_kms_alias
+          }
+        }
+      },
       {
         Effect = "Allow"
         Action = [
@@ -36,4 +36,4 @@ variable "create_policies" {
     description = "Whether to create policies (set to True in Phase 3)"
     type = bool
     default = false
-}
\ No newline at end of file
+}
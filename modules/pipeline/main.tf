@@ -1,8 +1,13 @@
 data "aws_caller_identity" "current" {}
 
+locals {
+  # Resource names are prefixed per service, so one project can hold many pipelines
+  name = var.service_name == "" ? var.project_name : "${var.project_name}-${var.service_name}"
+}
+
 # KMS Key for cross-account encryption
 resource "aws_kms_key" "artifact_encryption" {
-  description = "KMS key for ${var.project_name} cross-account CI/CD artifacts"
+  description = "KMS key for ${local.name} cross-account CI/CD artifacts"
   
   policy = jsonencode({
     Version = "2012-10-17"
@@ -56,23 +61,23 @@ resource "aws_kms_key" "artifact_encryption" {
   })
   
   tags = {
-    Name    = "${var.project_name}-artifact-key"
+    Name    = "${local.name}-artifact-key"
     Project = var.project_name
   }
 }
 
 resource "aws_kms_alias" "artifact_encryption" {
-  name          = "alias/${var.project_name}-artifact-key"
+  name          = "alias/${local.name}-artifact-key"
   target_key_id = aws_kms_key.artifact_encryption.key_id
 }
 
 # S3 Bucket for artifacts
 resource "aws_s3_bucket" "artifacts" {
-  bucket        = "${var.project_name}-artifacts-${var.tooling_account_id}"
+  bucket        = "${local.name}-artifacts-${var.tooling_account_id}"
   force_destroy = true
   
   tags = {
-    Name    = "${var.project_name}-artifacts"
+    Name    = "${local.name}-artifacts"
     Project = var.project_name
   }
 }
@@ -92,6 +97,9 @@ resource "aws_s3_bucket_server_side_encryption_configuration" "artifacts" {
       kms_master_key_id = aws_kms_key.artifact_encryption.arn
       sse_algorithm     = "aws:kms"
     }
+    
+    # One bucket-level data key per time window instead of a KMS call per object
+    bucket_key_enabled = var.bucket_key_enabled
   }
 }
 
@@ -150,18 +158,18 @@ resource "aws_s3_bucket_policy" "artifacts" {
 
 # CodeCommit Repository
 resource "aws_codecommit_repository" "app_repo" {
-  repository_name = "${var.project_name}-app"
-  description     = "Repository for ${var.project_name} application code"
+  repository_name = "${local.name}-app"
+  description     = "Repository for ${local.name} application code"
   
   tags = {
-    Name    = "${var.project_name}-app"
+    Name    = "${local.name}-app"
     Project = var.project_name
   }
 }
 
 # CodeBuild Service Role
 resource "aws_iam_role" "codebuild_role" {
-  name = "${var.project_name}-codebuild-role"
+  name = "${local.name}-codebuild-role"
   
   assume_role_policy = jsonencode({
     Version = "2012-10-17"
@@ -182,7 +190,7 @@ resource "aws_iam_role" "codebuild_role" {
 }
 
 resource "aws_iam_role_policy" "codebuild_policy" {
-  name = "${var.project_name}-codebuild-policy"
+  name = "${local.name}-codebuild-policy"
   role = aws_iam_role.codebuild_role.id
   
   policy = jsonencode({
@@ -195,7 +203,7 @@ resource "aws_iam_role_policy" "codebuild_policy" {
           "logs:CreateLogStream",
           "logs:PutLogEvents"
         ]
-        Resource = "arn:aws:logs:${var.region}:${var.tooling_account_id}:log-group:/aws/codebuild/${var.project_name}*"
+        Resource = "arn:aws:logs:${var.region}:${var.tooling_account_id}:log-group:/aws/codebuild/${local.name}*"
       },
       {
         Effect = "Allow"
@@ -223,8 +231,8 @@ resource "aws_iam_role_policy" "codebuild_policy" {
 
 # CodeBuild Project
 resource "aws_codebuild_project" "build" {
-  name         = "${var.project_name}-build"
-  description  = "Build project for ${var.project_name}"
+  name         = "${local.name}-build"
+  description  = "Build project for ${local.name}"
   service_role = aws_iam_role.codebuild_role.arn
   
   artifacts {
@@ -232,7 +240,7 @@ resource "aws_codebuild_project" "build" {
   }
   
   environment {
-    compute_type = "BUILD_GENERAL1_SMALL"
+    compute_type = var.build_compute_type
     image        = "aws/codebuild/amazonlinux2-x86_64-standard:3.0"
     type         = "LINUX_CONTAINER"
   }
@@ -249,7 +257,7 @@ resource "aws_codebuild_project" "build" {
 
 # CodePipeline Service Role
 resource "aws_iam_role" "codepipeline_role" {
-  name = "${var.project_name}-codepipeline-role"
+  name = "${local.name}-codepipeline-role"
   
   assume_role_policy = jsonencode({
     Version = "2012-10-17"
@@ -270,7 +278,7 @@ resource "aws_iam_role" "codepipeline_role" {
 }
 
 resource "aws_iam_role_policy" "codepipeline_policy" {
-  name = "${var.project_name}-codepipeline-policy"
+  name = "${local.name}-codepipeline-policy"
   role = aws_iam_role.codepipeline_role.id
   
   policy = jsonencode({
@@ -296,8 +304,10 @@ resource "aws_iam_role_policy" "codepipeline_policy" {
           "codecommit:GetBranch",
           "codecommit:GetCommit",
           "codecommit:GetRepository",
+          "codecommit:GetUploadArchiveStatus",
           "codecommit:ListBranches",
-          "codecommit:ListRepositories"
+          "codecommit:ListRepositories",
+          "codecommit:UploadArchive"
         ]
         Resource = aws_codecommit_repository.app_repo.arn
       },
@@ -333,7 +343,7 @@ resource "aws_iam_role_policy" "codepipeline_policy" {
 
 # CodePipeline
 resource "aws_codepipeline" "pipeline" {
-  name     = "${var.project_name}-pipeline"
+  name     = "${local.name}-pipeline"
   role_arn = aws_iam_role.codepipeline_role.arn
   
   artifact_store {
@@ -359,7 +369,7 @@ resource "aws_codepipeline" "pipeline" {
       
       configuration = {
         RepositoryName = aws_codecommit_repository.app_repo.repository_name
-        BranchName     = "main"
+        BranchName     = var.branch_name
       }
     }
   }
@@ -396,7 +406,7 @@ resource "aws_codepipeline" "pipeline" {
       
       configuration = {
         ActionMode    = "CREATE_UPDATE"
-        StackName     = "${var.project_name}-app-stack"
+        StackName     = "${local.name}-app-stack"
         TemplatePath  = "build_output::template.yml"
         Capabilities  = "CAPABILITY_IAM"
         RoleArn       = var.cloudformation_role_arn
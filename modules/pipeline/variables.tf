@@ -26,4 +26,28 @@ variable "codepipeline_role_arn" {
 variable "cloudformation_role_arn" {
   description = "ARN of the CloudFormation deployment role in prod account"
   type        = string
-}
\ No newline at end of file
+}
+
+variable "service_name" {
+  description = "Name of the service this pipeline builds; empty for the project's own pipeline"
+  type        = string
+  default     = ""
+}
+
+variable "branch_name" {
+  description = "Repository branch that triggers the pipeline"
+  type        = string
+  default     = "main"
+}
+
+variable "build_compute_type" {
+  description = "CodeBuild compute type for the build stage"
+  type        = string
+  default     = "BUILD_GENERAL1_SMALL"
+}
+
+variable "bucket_key_enabled" {
+  description = "Use S3 Bucket Keys for SSE-KMS on the artifact bucket to cut KMS requests"
+  type        = bool
+  default     = false
+}
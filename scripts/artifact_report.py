@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+import sys
+import json
+import argparse
+import statistics
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+GROWTH_HISTORY = 10
+GROWTH_MIN_BYTES = 1024 * 1024
+UNATTRIBUTED = "(unattributed)"
+
+def load_targets(service=None):
+    """Return the artifact bucket and pipeline name of the project or a service."""
+    outputs_file = Path(f"services/{service}/outputs.json" if service else "environments/tooling/outputs.json")
+    try:
+        with open(outputs_file) as f:
+            outputs = json.load(f)
+        return outputs["artifact_bucket_name"]["value"], outputs["pipeline_name"]["value"]
+    except (FileNotFoundError, KeyError, json.JSONDecodeError) as e:
+        print(f"❌ Error: Could not read the artifact bucket from {outputs_file}: {e}")
+        sys.exit(1)
+
+def artifact_usage(codepipeline, pipeline_name, bucket):
+    """Map each artifact object key to the action that wrote it and the actions that read it.
+
+    Artifact keys carry no execution ID, so the action execution history
+    is the only link between an object and the execution it belongs to.
+    """
+    usage = {}
+    paginator = codepipeline.get_paginator("list_action_executions")
+    for page in paginator.paginate(pipelineName=pipeline_name):
+        for action in page["actionExecutionDetails"]:
+            principal = action.get("input", {}).get("roleArn") or action["stageName"]
+            for artifact in action.get("output", {}).get("outputArtifacts", []):
+                location = artifact.get("s3location", {})
+                if location.get("bucket") == bucket:
+                    entry = usage.setdefault(location["key"], {"reads": []})
+                    entry.update({
+                        "execution": action["pipelineExecutionId"],
+                        "stage": action["stageName"],
+                        "artifact": artifact["name"],
+                        "written": action["startTime"],
+                        "writer": principal,
+                    })
+            for artifact in action.get("input", {}).get("inputArtifacts", []):
+                location = artifact.get("s3location", {})
+                if location.get("bucket") == bucket:
+                    usage.setdefault(location["key"], {"reads": []})["reads"].append((action["startTime"], principal))
+    return usage
+
+def stream_objects(s3, bucket):
+    """Aggregate the bucket's versions per key, one listing page at a time."""
+    objects = {}
+    paginator = s3.get_paginator("list_object_versions")
+    for page in paginator.paginate(Bucket=bucket):
+        for version in page.get("Versions", []):
+            entry = objects.setdefault(version["Key"], {"size": 0, "versions": 0, "total_bytes": 0, "current": False})
+            entry["versions"] += 1
+            entry["total_bytes"] += version["Size"]
+            if version.get("IsLatest"):
+                entry.update(size=version["Size"], modified=version["LastModified"], current=True)
+            elif not entry["current"]:
+                entry["modified"] = max(entry.get("modified", version["LastModified"]), version["LastModified"])
+    return objects
+
+def bucket_key_flags(s3, bucket, keys, jobs):
+    """Check which objects were encrypted with a bucket-level key (HEAD calls no KMS)."""
+    def check(key):
+        return key, s3.head_object(Bucket=bucket, Key=key).get("BucketKeyEnabled", False)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        return dict(executor.map(check, keys))
+
+def kms_events(obj, usage):
+    """List the KMS-relevant accesses of one object: (time, operation, principal)."""
+    events = [(usage.get("written", obj.get("modified")), "GenerateDataKey", usage.get("writer", UNATTRIBUTED))]
+    events.extend((at, "Decrypt", principal) for at, principal in usage.get("reads", []))
+    return events
+
+def estimate_kms_requests(accesses, window):
+    """Estimate KMS requests for a list of (time, operation, principal, bucket_key) accesses.
+
+    Without a bucket key every write is a GenerateDataKey and every read a
+    Decrypt. With one, S3 reuses a bucket-level key for a while, so the
+    estimate is one request per operation, principal and window.
+    """
+    requests = 0
+    windows = set()
+    for at, operation, principal, bucket_key in accesses:
+        if not bucket_key:
+            requests += 1
+        elif at is not None:
+            windows.add((operation, principal, int(at.timestamp() // window)))
+    return requests + len(windows)
+
+def flag_growth(rows, threshold):
+    """Flag artifacts much larger than the median of the previous executions' same artifact."""
+    history = {}
+    for row in sorted(rows, key=lambda r: r["written"]):
+        series = history.setdefault((row["stage"], row["artifact"]), [])
+        previous = series[-GROWTH_HISTORY:]
+        if previous:
+            median = statistics.median(previous)
+            row["growth"] = row["size"] / median if median else None
+            row["abnormal"] = row["size"] > threshold * median and row["size"] - median >= GROWTH_MIN_BYTES
+        series.append(row["size"])
+
+def _size(value):
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if value < 1024 or unit == "GiB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+def build_report(objects, usage, flags, window, threshold):
+    """Group objects by execution and stage, with size, versions, transfer and KMS estimates."""
+    rows = []
+    all_accesses, plain_accesses, keyed_accesses = [], [], []
+    for key, obj in objects.items():
+        entry = usage.get(key, {})
+        bucket_key = flags.get(key, False)
+        events = kms_events(obj, entry)
+        accesses = [(at, operation, principal, bucket_key) for at, operation, principal in events]
+        all_accesses.extend(accesses)
+        plain_accesses.extend((at, operation, principal, False) for at, operation, principal, _ in accesses)
+        keyed_accesses.extend((at, operation, principal, True) for at, operation, principal, _ in accesses)
+        rows.append({
+            "key": key,
+            "execution": entry.get("execution", UNATTRIBUTED),
+            "stage": entry.get("stage", "-"),
+            "artifact": entry.get("artifact", key.split("/")[-2] if key.count("/") >= 2 else "-"),
+            "written": entry.get("written", obj.get("modified")),
+            "size": obj["size"],
+            "versions": obj["versions"],
+            "total_bytes": obj["total_bytes"],
+            "transfer": obj["size"] * len(events),
+            "bucket_key": bucket_key,
+            "accesses": accesses,
+            "abnormal": False,
+        })
+    flag_growth([row for row in rows if row["execution"] != UNATTRIBUTED], threshold)
+
+    # Per-execution estimates, to compare executions before and after
+    # bucket keys were enabled
+    executions = {}
+    for row in rows:
+        executions.setdefault(row["execution"], []).append(row)
+    per_execution = {
+        execution: estimate_kms_requests([a for row in group for a in row["accesses"]], window)
+        for execution, group in executions.items()
+    }
+
+    return {
+        "rows": rows,
+        "executions": executions,
+        "per_execution": per_execution,
+        "kms_current": estimate_kms_requests(all_accesses, window),
+        "kms_without_keys": estimate_kms_requests(plain_accesses, window),
+        "kms_with_keys": estimate_kms_requests(keyed_accesses, window),
+    }
+
+def _growth_note(row):
+    # Earlier executions may have produced empty artifacts, so no ratio
+    if row["growth"] is None:
+        return "  ⚠️  usually empty"
+    return f"  ⚠️  {row['growth']:.1f}x the usual size"
+
+def display_report(report, limit, bucket_keys_enabled):
+    """Display the per-execution artifact table and the KMS request comparison."""
+    rows, executions = report["rows"], report["executions"]
+
+    print("\n" + "="*96)
+    print("📦 Artifact Report")
+    print("="*96)
+    header = f"{'Execution':<38} {'Stage':<8} {'Artifact':<12} {'Size':>10} {'Vers':>4} {'Transfer':>10} {'KMS':>5} {'BK':>2}"
+    print(header)
+    print("-" * len(header))
+
+    ordered = sorted(
+        (e for e in executions if e != UNATTRIBUTED),
+        key=lambda e: max(r["written"] for r in executions[e]), reverse=True
+    )
+    if UNATTRIBUTED in executions:
+        ordered.append(UNATTRIBUTED)
+    for execution in ordered[:limit]:
+        group = sorted(executions[execution], key=lambda r: r["written"])
+        for number, row in enumerate(group):
+            label = execution if number == 0 else ""
+            kms = report["per_execution"][execution] if number == 0 else ""
+            print(
+                f"{label:<38} {row['stage']:<8} {row['artifact'][:12]:<12} {_size(row['size']):>10} "
+                f"{row['versions']:>4} {_size(row['transfer']):>10} {kms:>5} {'✓' if row['bucket_key'] else '':>2}"
+                + (_growth_note(row) if row["abnormal"] else "")
+            )
+    if len(ordered) > limit:
+        print(f"... {len(ordered) - limit} older executions not shown (use --limit)")
+
+    total = sum(row["total_bytes"] for row in rows)
+    current = sum(row["size"] for row in rows)
+    print(f"\n  Objects:              {len(rows)} ({sum(row['versions'] for row in rows)} versions)")
+    print(f"  Stored:               {_size(total)} ({_size(total - current)} in noncurrent versions)")
+    print(f"  Transferred:          {_size(sum(row['transfer'] for row in rows))}")
+    abnormal = [row for row in rows if row["abnormal"]]
+    if abnormal:
+        print(f"  ⚠️  Abnormal growth:   {len(abnormal)} artifacts")
+
+    print("\n🔑 Estimated KMS requests")
+    print(f"  Bucket Keys on bucket: {'enabled' if bucket_keys_enabled else 'disabled'}")
+    print(f"  As encrypted:          {report['kms_current']}")
+    print(f"  Without bucket keys:   {report['kms_without_keys']}")
+    print(f"  With bucket keys:      {report['kms_with_keys']}")
+    if report["kms_without_keys"]:
+        saving = 1 - report["kms_with_keys"] / report["kms_without_keys"]
+        print(f"  Projected reduction:   {saving:.0%}")
+
+    # Measured on real executions: all of an execution's objects either
+    # used a bucket key or did not
+    with_keys = [n for e, n in report["per_execution"].items()
+                 if e != UNATTRIBUTED and all(r["bucket_key"] for r in executions[e])]
+    without_keys = [n for e, n in report["per_execution"].items()
+                    if e != UNATTRIBUTED and not any(r["bucket_key"] for r in executions[e])]
+    if with_keys and without_keys:
+        before, after = statistics.mean(without_keys), statistics.mean(with_keys)
+        print(f"  Per execution:         {before:.1f} before bucket keys, {after:.1f} after "
+              f"({1 - after / before:.0%} fewer)")
+    elif not bucket_keys_enabled:
+        print("\n👉 Set bucket_key_enabled = true in terraform.tfvars and redeploy Phase 2 to cut KMS requests")
+
+def main():
+    parser = argparse.ArgumentParser(description="Report artifact sizes, transfer and KMS requests per execution")
+    parser.add_argument("--service", help="report on a generated service pipeline instead of the project's")
+    parser.add_argument("--limit", type=int, default=20, help="executions to show (default: 20)")
+    parser.add_argument(
+        "--growth", type=float, default=1.5,
+        help="flag artifacts this many times the median of earlier executions (default: 1.5)"
+    )
+    parser.add_argument(
+        "--bucket-key-window", type=int, default=3600,
+        help="assumed lifetime in seconds of a bucket-level key for the estimate (default: 3600)"
+    )
+    parser.add_argument("--jobs", type=int, default=16, help="concurrent HEAD requests (default: 16)")
+    args = parser.parse_args()
+
+    import boto3
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    bucket, pipeline_name = load_targets(args.service)
+    print(f"📦 Artifact Report: {bucket}")
+    print("=" * 45)
+
+    session = boto3.Session(profile_name="tooling")
+    s3 = session.client("s3")
+    codepipeline = session.client("codepipeline")
+
+    try:
+        rules = s3.get_bucket_encryption(Bucket=bucket)["ServerSideEncryptionConfiguration"]["Rules"]
+        bucket_keys_enabled = any(rule.get("BucketKeyEnabled") for rule in rules)
+
+        print("  → Listing object versions...")
+        objects = stream_objects(s3, bucket)
+        print(f"  → Reading action executions of {pipeline_name}...")
+        usage = artifact_usage(codepipeline, pipeline_name, bucket)
+        print(f"  → Checking encryption of {sum(obj['current'] for obj in objects.values())} objects...")
+        flags = bucket_key_flags(s3, bucket, [key for key, obj in objects.items() if obj["current"]], args.jobs)
+    except (BotoCoreError, ClientError) as e:
+        print(f"❌ Error reading artifacts: {e}")
+        sys.exit(1)
+
+    report = build_report(objects, usage, flags, args.bucket_key_window, args.growth)
+    display_report(report, args.limit, bucket_keys_enabled)
+
+if __name__ == "__main__":
+    main()
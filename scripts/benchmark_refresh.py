@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+import sys
+import argparse
+import statistics
+from pathlib import Path
+
+from tf_tuning import (
+    REFRESH_MODES, config_addresses, config_digests, config_files, last_applied_run, plan_command, run_terraform,
+)
+from workspace import create_workspace, env_lock, remove_workspace, shared_env_path
+
+def targeted_baseline(env_path, changed):
+    """Return the baseline targeted runs compare against.
+
+    By default this is the last applied config. With changed files, it is
+    the current config with those files marked as edited, so the targeted
+    runs refresh exactly their resources.
+    """
+    if not changed:
+        return last_applied_run(env_path)
+
+    source = shared_env_path(env_path)
+    keys = {}
+    for key, path in config_files(env_path).items():
+        keys[path.resolve()] = key
+        if "/" not in key and key != "terraform.tfvars":
+            # Environment files are copies; accept the checkout path too
+            keys[(source / key).resolve()] = key
+
+    digests = config_digests(env_path)
+    for file_name in changed:
+        key = keys.get(Path(file_name).resolve())
+        if key is None:
+            print(f"❌ Error: {file_name} is not part of the {env_path.name} configuration")
+            sys.exit(1)
+        digests[key] = None
+    return {"files": digests, "addresses": config_addresses(env_path)}
+
+def benchmark_mode(env_path, mode, runs, baseline=None):
+    """Time repeated plans in one refresh mode and return the durations.
+
+    Benchmark plans are not recorded in the run history, so they neither
+    tune parallelism nor move the targeted-refresh baseline.
+    """
+    durations = []
+    for _ in range(runs):
+        plan_cmd, _ = plan_command(env_path, mode, extra_args=["-input=false", "-lock=false"], baseline=baseline)
+        plan_cmd = [arg for arg in plan_cmd if not arg.startswith("-out=")]
+        _, duration = run_terraform(plan_cmd, cwd=env_path, refresh=mode, quiet=True, record=False)
+        durations.append(duration)
+    return durations
+
+def display_results(env_name, results):
+    """Display a timing table for each benchmarked mode."""
+    print("\n" + "="*60)
+    print(f"📊 Refresh Mode Benchmark: {env_name}")
+    print("="*60)
+    print(f"\n  {'Mode':<10} {'Runs':>5} {'Min (s)':>9} {'Median (s)':>11} {'Max (s)':>9}")
+
+    baseline = statistics.median(results["full"]) if "full" in results else None
+    for mode, durations in results.items():
+        median = statistics.median(durations)
+        line = f"  {mode:<10} {len(durations):>5} {min(durations):>9.2f} {median:>11.2f} {max(durations):>9.2f}"
+        if baseline and mode != "full" and median:
+            line += f"   ({baseline / median:.1f}x vs full)"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Terraform plan refresh modes")
+    parser.add_argument("env", choices=["prod", "tooling"], help="environment to plan")
+    parser.add_argument(
+        "--modes", nargs="+", choices=REFRESH_MODES, default=["full", "fast", "targeted"],
+        help="refresh modes to compare"
+    )
+    parser.add_argument("--runs", type=int, default=3, help="plans per mode (default: 3)")
+    parser.add_argument(
+        "--changed", metavar="FILE", action="append",
+        help="treat this config file as edited for targeted runs (repeatable; default: changes since the last apply)"
+    )
+    args = parser.parse_args()
+
+    env_path = Path(f"environments/{args.env}")
+    if not (env_path / ".terraform").is_dir():
+        print(f"❌ Error: {env_path} is not initialized. Run terraform init first.")
+        sys.exit(1)
+
+    print(f"⏱️  Benchmarking refresh modes for {args.env}")
+    print("=" * 45)
+
+    # Plans only read state, so benchmarks can run next to each other
+    workspace_path = create_workspace(args.env)
+    results = {}
+    try:
+        with env_lock(workspace_path, exclusive=False):
+            # Fixed before any run, so every targeted run refreshes the same set
+            baseline = targeted_baseline(workspace_path, args.changed) if "targeted" in args.modes else None
+            for mode in args.modes:
+                print(f"\n📦 Mode: {mode}")
+                results[mode] = benchmark_mode(
+                    workspace_path, mode, args.runs, baseline if mode == "targeted" else None
+                )
+    finally:
+        remove_workspace(workspace_path)
+
+    display_results(args.env, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+import sys
+import time
+import argparse
+from datetime import datetime, timezone
+
+from tfvars import TfvarsError, load_tfvars
+
+BATCH_LIMIT = 10000
+MIN_INTERVAL = 1.0
+MAX_INTERVAL = 15.0
+
+def make_clients(local_dir=None):
+    """Return CodeBuild and CloudWatch Logs clients, or their local stand-ins."""
+    if local_dir:
+        from local_standins import LocalCodeBuild, LocalLogs
+        return LocalCodeBuild(local_dir), LocalLogs(local_dir)
+
+    import boto3
+    session = boto3.Session(profile_name="tooling")
+    return session.client("codebuild"), session.client("logs")
+
+def find_build(codebuild, project_name, build_id=None):
+    """Return the requested build, or the project's latest one."""
+    if not build_id:
+        ids = codebuild.list_builds_for_project(projectName=project_name, sortOrder="DESCENDING")["ids"]
+        if not ids:
+            return None
+        build_id = ids[0]
+    builds = codebuild.batch_get_builds(ids=[build_id])["builds"]
+    return builds[0] if builds else None
+
+def _clock(value):
+    if isinstance(value, (int, float)):
+        value = datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+    return value.strftime("%H:%M:%S") if value else "--:--:--"
+
+def report_phases(build, reported):
+    """Print each build phase once it has finished, with its timestamps."""
+    for phase in build.get("phases", []):
+        key = (phase["phaseType"], phase.get("phaseStatus"))
+        if not phase.get("phaseStatus") or key in reported:
+            continue
+        reported.add(key)
+        duration = phase.get("durationInSeconds")
+        print(
+            f"⏱️  {phase['phaseType']:<16} {phase['phaseStatus']:<10} "
+            f"{_clock(phase.get('startTime'))} → {_clock(phase.get('endTime'))}"
+            + (f" ({duration}s)" if duration is not None else "")
+        )
+
+def fetch_new_events(logs, group, stream, token):
+    """Fetch every event after a forward token, in batches.
+
+    Returns the events and the token to continue from; CloudWatch returns
+    the same token once there is nothing more to read. The stream only
+    exists once the build has written to it, so until then there are
+    simply no events yet.
+    """
+    events = []
+    while True:
+        kwargs = {"logGroupName": group, "logStreamName": stream, "startFromHead": True, "limit": BATCH_LIMIT}
+        if token:
+            kwargs["nextToken"] = token
+        try:
+            response = logs.get_log_events(**kwargs)
+        except logs.exceptions.ResourceNotFoundException:
+            return events, token
+        events.extend(response["events"])
+        next_token = response["nextForwardToken"]
+        if next_token == token or not response["events"]:
+            return events, next_token
+        token = next_token
+
+def tail_build(codebuild, logs, build, follow=True, sleep=time.sleep):
+    """Print a build's log incrementally until the build completes.
+
+    The polling interval starts at one second, doubles while nothing new
+    arrives, up to MAX_INTERVAL, and drops back as soon as there is output.
+    """
+    reported = set()
+    token = None
+    interval = MIN_INTERVAL
+
+    while True:
+        report_phases(build, reported)
+
+        log_info = build.get("logs", {})
+        group, stream = log_info.get("groupName"), log_info.get("streamName")
+        events = []
+        if group and stream:
+            events, token = fetch_new_events(logs, group, stream, token)
+            for event in events:
+                print(f"[{_clock(event['timestamp'])}] {event['message'].rstrip()}")
+
+        if build.get("buildComplete") and not events:
+            report_phases(build, reported)
+            return build["buildStatus"]
+        if not follow:
+            return build.get("buildStatus")
+
+        interval = MIN_INTERVAL if events else min(interval * 2, MAX_INTERVAL)
+        sleep(interval)
+        build = codebuild.batch_get_builds(ids=[build["id"]])["builds"][0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Tail the latest CodeBuild build log")
+    parser.add_argument("--build-id", help="build to show (default: the project's latest)")
+    parser.add_argument("--no-follow", action="store_true", help="print what is there and exit")
+    parser.add_argument(
+        "--local", metavar="DIR",
+        help="read builds.json and logs/ from a local stand-in directory instead of AWS"
+    )
+    args = parser.parse_args()
+
+    try:
+        project_name = f"{load_tfvars()['project_name']}-build"
+    except (OSError, KeyError, TfvarsError) as e:
+        print(f"❌ Error: Could not read project_name from terraform.tfvars: {e}")
+        sys.exit(1)
+
+    print(f"📜 Build Logs: {project_name}")
+    print("=" * 45)
+
+    try:
+        codebuild, logs = make_clients(args.local)
+        build = find_build(codebuild, project_name, args.build_id)
+        if build is None:
+            print("⚠️  No builds found for this project yet")
+            sys.exit(1)
+
+        print(f"  → Build {build['id']} ({build['buildStatus']})\n")
+        status = tail_build(codebuild, logs, build, follow=not args.no_follow)
+    except KeyboardInterrupt:
+        print("\n⏹️  Stopped following the log")
+        sys.exit(130)
+    except Exception as e:
+        print(f"❌ Error reading build logs: {e}")
+        sys.exit(1)
+
+    if status == "SUCCEEDED":
+        print("\n✅ Build succeeded")
+    elif status == "IN_PROGRESS":
+        print("\n⏳ Build still in progress")
+    else:
+        print(f"\n❌ Build finished with status: {status}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -2,23 +2,13 @@
 import os
 import sys
 import json
-import subprocess
+import argparse
 from pathlib import Path
 
-def run_command(cmd, cwd=None, capture_output=False):
-    """Run a shell command and handle errors."""
-    print(f"  → Running: {' '.join(cmd)}")
-    try:
-        if capture_output:
-            result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, check=True)
-            return result.stdout
-        else:
-            subprocess.run(cmd, cwd=cwd, check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Command failed: {e}")
-        if capture_output and e.stderr:
-            print(f"Error output: {e.stderr}")
-        sys.exit(1)
+from policy_check import check_plan
+from shell import run_command
+from tf_tuning import REFRESH_MODES, apply_command, plan_command, run_terraform
+from workspace import create_workspace, env_lock, publish, remove_workspace
 
 def check_prerequisites():
     """Check that Phase 1 outputs exist."""
@@ -52,39 +42,52 @@ def check_prerequisites():
         print(f"❌ Error: Invalid JSON in prod outputs: {e}")
         sys.exit(1)
 
-def deploy_environment(env_name):
+def deploy_environment(env_name, refresh_mode="full", workspace_name=None, keep_workspace=False, check_policies=True):
     """Deploy Terraform configuration for an environment."""
     print(f"\n📦 Deploying to {env_name} environment...")
     
-    env_path = Path(f"environments/{env_name}")
-    
-    # Initialize Terraform
-    print("  → Initializing Terraform...")
-    run_command(["terraform", "init"], cwd=env_path)
-    
-    # Plan
-    print("  → Planning changes...")
-    run_command([
-        "terraform", "plan",
-        "-var-file=../../terraform.tfvars",
-        "-out=tfplan"
-    ], cwd=env_path)
-    
-    # Apply
-    print("  → Applying changes...")
-    run_command(["terraform", "apply", "tfplan"], cwd=env_path)
-    
-    # Capture outputs
-    print("  → Capturing outputs...")
-    outputs_json = run_command([
-        "terraform", "output", "-json"
-    ], cwd=env_path, capture_output=True)
+    env_path = create_workspace(env_name, workspace_name)
+    print(f"  → Workspace: {env_path}")
     
-    # Save outputs to file
-    outputs_file = env_path / "outputs.json"
-    with open(outputs_file, "w") as f:
-        f.write(outputs_json)
+    with env_lock(env_path):
+        # Initialize Terraform
+        print("  → Initializing Terraform...")
+        run_command(["terraform", "init"], cwd=env_path)
     
+        # Plan
+        print("  → Planning changes...")
+        plan_cmd, refresh = plan_command(env_path, refresh_mode)
+        run_terraform(plan_cmd, cwd=env_path, refresh=refresh)
+
+        # Catch bucket and key policies that would break the pipeline
+        if check_policies and not check_plan(env_name, env_path):
+            print("❌ Error: The planned policies deny permissions the pipeline needs")
+            print(f"   Fix them and re-run, or pass --skip-policy-check to apply anyway (workspace: {env_path})")
+            sys.exit(1)
+    
+        # Apply
+        print("  → Applying changes...")
+        run_terraform(apply_command(env_path), cwd=env_path)
+    
+        # Capture outputs
+        print("  → Capturing outputs...")
+        outputs_json = run_command([
+            "terraform", "output", "-json"
+        ], cwd=env_path, capture_output=True)
+    
+        # Save outputs to file
+        outputs_file = env_path / "outputs.json"
+        with open(outputs_file, "w") as f:
+            f.write(outputs_json)
+
+        # Make the outputs visible to the checkout and the other phases
+        publish(env_path, "outputs.json")
+        if (env_path / ".terraform.lock.hcl").exists():
+            publish(env_path, ".terraform.lock.hcl")
+
+    if not keep_workspace:
+        remove_workspace(env_path)
+
     print(f"✅ {env_name} environment deployed successfully!")
     return json.loads(outputs_json)
 
@@ -110,6 +113,25 @@ def display_results(tooling_outputs, prod_outputs):
     print("  3. Test the pipeline deployment")
 
 def main():
+    parser = argparse.ArgumentParser(description="Phase 2: Pipeline Infrastructure Deployment")
+    parser.add_argument(
+        "--refresh", choices=REFRESH_MODES, default="full",
+        help="how much state to refresh before planning (default: full)"
+    )
+    parser.add_argument(
+        "--workspace", metavar="NAME",
+        help="name of the scratch workspace to create or reuse (default: a new one per run)"
+    )
+    parser.add_argument(
+        "--keep-workspace", action="store_true",
+        help="keep the workspace after a successful run"
+    )
+    parser.add_argument(
+        "--skip-policy-check", action="store_true",
+        help="apply without checking the planned policies against the pipeline's permissions"
+    )
+    args = parser.parse_args()
+
     print("🚀 Starting Phase 2: Pipeline Infrastructure Deployment")
     print("=" * 58)
     
@@ -117,7 +139,9 @@ def main():
     prod_outputs = check_prerequisites()
     
     # Deploy to tooling environment
-    tooling_outputs = deploy_environment("tooling")
+    tooling_outputs = deploy_environment(
+        "tooling", args.refresh, args.workspace, args.keep_workspace, not args.skip_policy_check
+    )
     
     # Display results
     display_results(tooling_outputs, prod_outputs)
@@ -2,23 +2,22 @@
 import os
 import sys
 import json
-import subprocess
+import shutil
+import argparse
 from pathlib import Path
 
-def run_command(cmd, cwd=None, capture_output=False):
-    """Run a shell command and handle errors."""
-    print(f"  → Running: {' '.join(cmd)}")
-    try:
-        if capture_output:
-            result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, check=True)
-            return result.stdout
-        else:
-            subprocess.run(cmd, cwd=cwd, check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Command failed: {e}")
-        if capture_output and e.stderr:
-            print(f"Error output: {e.stderr}")
-        sys.exit(1)
+from step_journal import (
+    dir_digest, file_digest, finish_step, first_incomplete_step, get_step,
+    load_journal, new_journal, read_journal, start_step, step_is_current,
+)
+from policy_check import check_plan
+from render import TemplateError, render_template
+from shell import run_command
+from workspace import create_workspace, env_lock, find_workspaces, publish, remove_workspace
+from tf_tuning import REFRESH_MODES, apply_command, plan_command, run_terraform
+
+PHASE3_STEPS = ["init", "plan", "apply", "outputs"]
+PHASE3_TEMPLATE = "phase3_prod.tf.tmpl"
 
 def check_prerequisites():
     """Check that Phase 1 and Phase 2 outputs exist."""
@@ -72,129 +71,170 @@ def check_prerequisites():
         sys.exit(1)
 
 def create_phase3_config(tooling_outputs):
-    """Create temporary Terraform configuration for Phase 3."""
+    """Render the Terraform configuration for Phase 3."""
     print("📝 Creating Phase 3 configuration...")
-    
-    config_content = f'''terraform {{
-  required_version = ">= 1.0"
-  
-  required_providers {{
-    aws = {{
-      source  = "hashicorp/aws"
-      version = "~> 5.0"
-    }}
-  }}
-}}
-
-provider "aws" {{
-  region  = var.region
-  profile = "prod"
-}}
 
-variable "tooling_account_id" {{
-  type = string
-}}
-
-variable "region" {{
-  type = string
-}}
+    try:
+        return render_template(
+            PHASE3_TEMPLATE,
+            artifact_bucket_name=tooling_outputs['artifact_bucket_name']['value'],
+            artifact_bucket_arn=tooling_outputs['artifact_bucket_arn']['value'],
+            kms_key_arn=tooling_outputs['kms_key_arn']['value'],
+        )
+    except (OSError, KeyError, TemplateError) as e:
+        print(f"❌ Error: Could not render {PHASE3_TEMPLATE}: {e}")
+        sys.exit(1)
 
-variable "project_name" {{
-  type = string
-}}
+def install_phase3_config(env_path, config_content):
+    """Swap the Phase 3 configuration into main.tf, keeping a Phase 1 backup."""
+    original_config = env_path / "main.tf"
+    backup_config = env_path / "main.tf.phase1.backup"
 
-# Phase 3: Deploy roles WITH policies
-module "iam_roles" {{
-  source = "../../modules/iam-roles"
-  
-  tooling_account_id = var.tooling_account_id
-  prod_account_id    = var.prod_account_id
-  project_name       = var.project_name
-  
-  # Phase 3: Create policies with S3/KMS resources
-  create_policies       = true
-  artifact_bucket_name  = "{tooling_outputs['artifact_bucket_name']['value']}"
-  artifact_bucket_arn   = "{tooling_outputs['artifact_bucket_arn']['value']}"
-  kms_key_arn          = "{tooling_outputs['kms_key_arn']['value']}"
-}}
+    if original_config.exists() and original_config.read_text() == config_content:
+        print("  → Phase 3 configuration already in place")
+        return
 
-output "codepipeline_role_arn" {{
-  value = module.iam_roles.codepipeline_role_arn
-}}
+    if not backup_config.exists():
+        print("  → Backing up Phase 1 configuration...")
+        shutil.copy2(original_config, backup_config)
 
-output "cloudformation_role_arn" {{
-  value = module.iam_roles.cloudformation_role_arn
-}}
-'''
-    
-    # Write temporary configuration
-    temp_config = Path("environments/prod/main_phase3.tf.tmp")
+    # Write the new config beside main.tf and swap it in with one rename,
+    # so an interrupted run never leaves the environment without a main.tf
+    temp_config = env_path / "main_phase3.tf.tmp"
     with open(temp_config, "w") as f:
         f.write(config_content)
-    
-    return temp_config
+    os.replace(temp_config, original_config)
+
+def find_phase3_workspace():
+    """Return the newest workspace holding a Phase 3 journal, if any."""
+    for env_path in find_workspaces("prod"):
+        journal = read_journal(env_path)
+        if journal and journal.get("phase") == "phase3":
+            return env_path
+    return None
 
-def deploy_phase3():
-    """Deploy Phase 3 configuration."""
+def deploy_phase3(config_content, resume=False, refresh_mode="full", workspace_name=None, check_policies=True):
+    """Deploy Phase 3 in an isolated workspace, skipping steps the journal shows as done."""
     print("\n📦 Deploying Phase 3: IAM Roles with Complete Policies...")
-    
-    env_path = Path("environments/prod")
-    
-    # Backup original config
-    original_config = env_path / "main.tf"
-    backup_config = env_path / "main.tf.phase1.backup"
-    
-    print("  → Backing up Phase 1 configuration...")
-    original_config.rename(backup_config)
-    
-    # Use Phase 3 config
-    temp_config = env_path / "main_phase3.tf.tmp"
-    phase3_config = env_path / "main.tf"
-    temp_config.rename(phase3_config)
-    
-    try:
-        # Initialize (in case provider changed)
+
+    env_path = None
+    if resume and not workspace_name:
+        env_path = find_phase3_workspace()
+    if env_path is None:
+        env_path = create_workspace("prod", workspace_name)
+    print(f"  → Workspace: {env_path}")
+
+    if resume:
+        journal = load_journal(env_path, "phase3")
+        step = first_incomplete_step(journal, PHASE3_STEPS)
+        if step:
+            print(f"  → Resuming from step: {step}")
+    else:
+        journal = new_journal(env_path, "phase3")
+
+    with env_lock(env_path):
+        outputs = run_phase3_steps(env_path, journal, config_content, refresh_mode, check_policies)
+
+        # Make the results visible to the checkout and the other phases
+        print("  → Publishing configuration and outputs...")
+        for file_name in ("main.tf", "outputs.json", ".terraform.lock.hcl"):
+            if (env_path / file_name).exists():
+                publish(env_path, file_name)
+
+    print("✅ Phase 3 deployment successful!")
+    return env_path, outputs
+
+def run_phase3_steps(env_path, journal, config_content, refresh_mode, check_policies=True):
+    """Run init, plan, apply and outputs in a workspace, skipping completed steps."""
+    plan_file = env_path / "tfplan"
+    state_file = env_path / "terraform.tfstate"
+    outputs_file = env_path / "outputs.json"
+
+    install_phase3_config(env_path, config_content)
+
+    config_inputs = {
+        "main.tf": file_digest(env_path / "main.tf"),
+        "module": dir_digest("modules/iam-roles"),
+    }
+
+    # Initialize (in case provider changed)
+    if step_is_current(journal, "init", config_inputs) and (env_path / ".terraform").is_dir():
+        print("  → Terraform already initialized, skipping init")
+    else:
         print("  → Initializing Terraform...")
+        start_step(env_path, journal, "init", config_inputs)
         run_command(["terraform", "init"], cwd=env_path)
-        
-        # Plan
-        print("  → Planning changes...")
-        run_command([
-            "terraform", "plan",
-            "-var-file=../../terraform.tfvars",
-            "-out=tfplan"
-        ], cwd=env_path)
-        
-        # Apply
+        finish_step(env_path, journal, "init")
+
+    # Plan
+    plan_inputs = {**config_inputs, "tfvars": file_digest("terraform.tfvars")}
+    plan_entry = get_step(journal, "plan")
+    apply_interrupted = (
+        get_step(journal, "apply").get("status") == "started"
+        or (plan_entry.get("status") == "started" and plan_entry.get("after_partial_apply", False))
+    )
+    saved_plan = plan_entry.get("outputs", {}).get("tfplan")
+
+    if (step_is_current(journal, "plan", plan_inputs)
+            and not apply_interrupted
+            and saved_plan == file_digest(plan_file)):
+        print("  → Saved plan is still valid, skipping plan")
+    else:
+        if apply_interrupted:
+            # The failed apply already wrote what it changed to state, and
+            # everything else was refreshed by the original plan
+            print("  → Previous apply was interrupted, re-planning from state without refresh...")
+            plan_cmd, refresh = plan_command(env_path, "fast")
+        else:
+            print("  → Planning changes...")
+            plan_cmd, refresh = plan_command(env_path, refresh_mode)
+        start_step(env_path, journal, "plan", plan_inputs, after_partial_apply=apply_interrupted)
+        run_terraform(plan_cmd, cwd=env_path, refresh=refresh)
+        finish_step(env_path, journal, "plan", {"tfplan": file_digest(plan_file)})
+
+    # Apply
+    apply_inputs = {"tfplan": get_step(journal, "plan")["outputs"]["tfplan"]}
+    if step_is_current(journal, "apply", apply_inputs):
+        print("  → Plan already applied, skipping apply")
+    else:
+        # Catch policies that would break the pipeline before they are live
+        if check_policies and not check_plan("prod", env_path):
+            print("❌ Error: The planned policies deny permissions the pipeline needs")
+            print("   Fix them and re-run, or pass --skip-policy-check to apply anyway")
+            sys.exit(1)
         print("  → Applying changes...")
-        run_command(["terraform", "apply", "tfplan"], cwd=env_path)
-        
-        # Capture outputs
+        start_step(env_path, journal, "apply", apply_inputs)
+        run_terraform(apply_command(env_path), cwd=env_path)
+        finish_step(env_path, journal, "apply", {"tfstate": file_digest(state_file)})
+
+    # Capture outputs
+    outputs_inputs = {"tfstate": get_step(journal, "apply")["outputs"]["tfstate"]}
+    if (step_is_current(journal, "outputs", outputs_inputs)
+            and get_step(journal, "outputs")["outputs"].get("outputs.json") == file_digest(outputs_file)):
+        print("  → Outputs already captured, skipping output")
+        with open(outputs_file) as f:
+            outputs_json = f.read()
+    else:
         print("  → Capturing outputs...")
+        start_step(env_path, journal, "outputs", outputs_inputs)
         outputs_json = run_command([
             "terraform", "output", "-json"
         ], cwd=env_path, capture_output=True)
         
         # Save outputs
-        outputs_file = env_path / "outputs.json"
         with open(outputs_file, "w") as f:
             f.write(outputs_json)
-        
-        print("✅ Phase 3 deployment successful!")
-        return json.loads(outputs_json)
-        
-    except Exception as e:
-        print(f"❌ Deployment failed: {e}")
-        # Restore original config on failure
-        if phase3_config.exists():
-            phase3_config.unlink()
-        if backup_config.exists():
-            backup_config.rename(original_config)
-        raise
+        finish_step(env_path, journal, "outputs", {"outputs.json": file_digest(outputs_file)})
+    
+    return json.loads(outputs_json)
 
-def cleanup_temp_files():
+def cleanup_temp_files(workspace_path, keep_workspace=False):
     """Clean up temporary files."""
     print("🧹 Cleaning up temporary files...")
+
+    if not keep_workspace:
+        remove_workspace(workspace_path)
+        print("  → Removed workspace")
     
     env_path = Path("environments/prod")
     backup_config = env_path / "main.tf.phase1.backup"
@@ -231,6 +271,29 @@ def display_results(prod_outputs, tooling_outputs):
     print("  3. Validate cross-account functionality")
 
 def main():
+    parser = argparse.ArgumentParser(description="Phase 3: Complete IAM Policies")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="continue from the first incomplete step of the previous run"
+    )
+    parser.add_argument(
+        "--refresh", choices=REFRESH_MODES, default="full",
+        help="how much state to refresh before planning (default: full)"
+    )
+    parser.add_argument(
+        "--workspace", metavar="NAME",
+        help="name of the scratch workspace to create or reuse (default: a new one per run)"
+    )
+    parser.add_argument(
+        "--keep-workspace", action="store_true",
+        help="keep the workspace after a successful run"
+    )
+    parser.add_argument(
+        "--skip-policy-check", action="store_true",
+        help="apply without checking the planned policies against the pipeline's permissions"
+    )
+    args = parser.parse_args()
+
     print("🔄 Starting Phase 3: Complete IAM Policies")
     print("=" * 45)
     
@@ -238,23 +301,25 @@ def main():
     prod_outputs, tooling_outputs = check_prerequisites()
     
     # Create Phase 3 configuration
-    temp_config = create_phase3_config(tooling_outputs)
+    config_content = create_phase3_config(tooling_outputs)
     
     try:
         # Deploy Phase 3
-        updated_prod_outputs = deploy_phase3()
+        workspace_path, updated_prod_outputs = deploy_phase3(
+            config_content, resume=args.resume, refresh_mode=args.refresh, workspace_name=args.workspace,
+            check_policies=not args.skip_policy_check
+        )
         
         # Clean up
-        cleanup_temp_files()
+        cleanup_temp_files(workspace_path, args.keep_workspace)
         
         # Display results
         display_results(updated_prod_outputs, tooling_outputs)
         
-    except Exception as e:
-        print(f"\n❌ Phase 3 failed: {e}")
-        # Clean up temp files
-        if temp_config.exists():
-            temp_config.unlink()
+    except (Exception, SystemExit) as e:
+        if not isinstance(e, SystemExit):
+            print(f"\n❌ Phase 3 failed: {e}")
+        print("   Completed steps are recorded in the workspace; re-run with --resume to continue")
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from shell import run_command
+from tf_tuning import PLUGIN_CACHE_DIR, choose_parallelism, run_terraform
+from workspace import create_workspace, env_lock, remove_workspace
+
+DEFAULT_TARGETS = [
+    {"name": "prod", "env": "prod"},
+    {"name": "tooling", "env": "tooling"},
+]
+TARGETS_FILE = "drift_targets.json"
+DRIFT_PLAN = "drift.tfplan"
+
+def load_targets(targets_file):
+    """Load the drift targets, defaulting to the two checkout environments.
+
+    Each target names an environment and can point at its own state,
+    tfvars, recorded outputs and AWS profile, so one environment's config
+    can be checked against many accounts.
+    """
+    if not Path(targets_file).exists():
+        return DEFAULT_TARGETS
+    try:
+        with open(targets_file) as f:
+            targets = json.load(f)
+    except json.JSONDecodeError as e:
+        print(f"❌ Error: Invalid JSON in {targets_file}: {e}")
+        sys.exit(1)
+
+    for target in targets:
+        if "name" not in target or target.get("env") not in ("prod", "tooling"):
+            print(f"❌ Error: Each target in {targets_file} needs a name and env (prod or tooling)")
+            sys.exit(1)
+    return targets
+
+def is_initialized(env_name):
+    """Check that an environment already has modules and providers installed."""
+    terraform_dir = Path(f"environments/{env_name}/.terraform")
+    return (terraform_dir / "modules" / "modules.json").exists() and (terraform_dir / "providers").is_dir()
+
+def prepare_workspace(target):
+    """Create a workspace for a target, pointing it at the target's own files."""
+    repo = Path.cwd()
+    links = {}
+    if target.get("state"):
+        links["terraform.tfstate"] = repo / target["state"]
+
+    env_path = create_workspace(target["env"], f"drift-{target['name']}-{os.getpid()}", links)
+
+    if target.get("profile"):
+        main_config = env_path / "main.tf"
+        config = re.sub(
+            r'(provider\s+"aws"\s*\{[^}]*?profile\s*=\s*)"[^"]*"',
+            lambda m: f'{m.group(1)}"{target["profile"]}"',
+            main_config.read_text()
+        )
+        main_config.write_text(config)
+    return env_path
+
+def recorded_outputs(target):
+    """Load the outputs.json a target was last deployed with."""
+    outputs_file = Path(target.get("outputs", f"environments/{target['env']}/outputs.json"))
+    try:
+        with open(outputs_file) as f:
+            return {name: output.get("value") for name, output in json.load(f).items()}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def check_target(target):
+    """Run a refresh-only plan for one target and collect what drifted."""
+    started = time.monotonic()
+    result = {"name": target["name"], "resources": [], "outputs": [], "error": None}
+    env_path = prepare_workspace(target)
+
+    plan_cmd = [
+        "terraform", "plan",
+        "-refresh-only",
+        "-detailed-exitcode",
+        "-input=false",
+        "-no-color",
+        # Readers share the environment lock, which already keeps applies out
+        "-lock=false",
+        f"-parallelism={choose_parallelism(env_path)}",
+        "-var-file=../../terraform.tfvars",
+        f"-out={DRIFT_PLAN}",
+    ]
+    if target.get("var_file"):
+        plan_cmd.insert(-1, f"-var-file={(Path.cwd() / target['var_file']).resolve()}")
+
+    try:
+        with env_lock(env_path, exclusive=False):
+            output = []
+            returncode, _ = run_terraform(plan_cmd, cwd=env_path, refresh="drift", quiet=True, check=False, output=output)
+            if returncode == 1:
+                result["error"] = "".join(output[-20:]).strip()
+                return result
+
+            shown = subprocess.run(
+                ["terraform", "show", "-json", DRIFT_PLAN],
+                cwd=env_path, capture_output=True, text=True
+            )
+        if shown.returncode != 0:
+            result["error"] = shown.stderr.strip()
+            return result
+
+        plan = json.loads(shown.stdout)
+        for drift in plan.get("resource_drift", []):
+            result["resources"].append((drift["address"], "/".join(drift["change"]["actions"])))
+
+        recorded = recorded_outputs(target)
+        planned = {name: output.get("value") for name, output in plan.get("planned_values", {}).get("outputs", {}).items()}
+        if recorded is not None:
+            for name in sorted(set(recorded) | set(planned)):
+                if recorded.get(name) != planned.get(name):
+                    result["outputs"].append((name, recorded.get(name), planned.get(name)))
+    finally:
+        result["duration"] = time.monotonic() - started
+        remove_workspace(env_path)
+
+    return result
+
+def display_report(results):
+    """Display drifted resources and outputs for every target."""
+    print("\n" + "="*60)
+    print("📊 Drift Report")
+    print("="*60)
+
+    for result in results:
+        if result["error"]:
+            print(f"\n❌ {result['name']}: error ({result['duration']:.1f}s)")
+            for line in result["error"].splitlines():
+                print(f"    {line}")
+        elif result["resources"] or result["outputs"]:
+            print(f"\n⚠️  {result['name']}: drift detected ({result['duration']:.1f}s)")
+            for address, actions in result["resources"]:
+                print(f"    ~ {address} ({actions})")
+            for name, recorded, current in result["outputs"]:
+                print(f"    ~ output {name}: {recorded!r} → {current!r}")
+        else:
+            print(f"\n✅ {result['name']}: no drift ({result['duration']:.1f}s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect drift in every environment concurrently")
+    parser.add_argument(
+        "--targets", default=TARGETS_FILE,
+        help=f"JSON list of targets to check (default: {TARGETS_FILE}, or prod and tooling)"
+    )
+    parser.add_argument("--jobs", type=int, default=8, help="targets checked at once (default: 8)")
+    args = parser.parse_args()
+
+    print("🔎 Drift Detection")
+    print("=" * 45)
+
+    targets = load_targets(args.targets)
+
+    # Reuse downloaded providers across environments and runs
+    PLUGIN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    os.environ.setdefault("TF_PLUGIN_CACHE_DIR", str(PLUGIN_CACHE_DIR))
+    os.environ.setdefault("TF_IN_AUTOMATION", "1")
+
+    # Init writes the shared .terraform directory, so it runs once per
+    # environment and only when the cache is missing
+    for env_name in sorted({target["env"] for target in targets}):
+        if not is_initialized(env_name):
+            env_path = Path(f"environments/{env_name}")
+            print(f"  → Initializing {env_name}...")
+            with env_lock(env_path):
+                run_command(["terraform", "init", "-input=false"], cwd=env_path)
+
+    print(f"  → Checking {len(targets)} targets...")
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        results = list(executor.map(check_target, targets))
+
+    display_report(results)
+
+    if any(result["error"] for result in results):
+        sys.exit(1)
+    if any(result["resources"] or result["outputs"] for result in results):
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from render import TemplateError, render_template
+from shell import run_command
+from step_journal import dir_digest, file_digest
+from tf_tuning import PLUGIN_CACHE_DIR, plan_command, run_terraform
+from tfvars import TfvarsError, load_tfvars
+from workspace import env_lock
+
+SERVICES_FILE = "services.json"
+SERVICES_DIR = Path("services")
+RENDER_CACHE_FILE = Path(".render_cache.json")
+SERVICE_TEMPLATE = "service_pipeline.tf.tmpl"
+SERVICE_NAME_PATTERN = re.compile(r"[a-z][a-z0-9-]*")
+SERVICE_NAME_MAX_LENGTH = 30
+SERVICE_DEFAULTS = {"branch": "main", "build_compute_type": "BUILD_GENERAL1_SMALL"}
+
+# Names modules/pipeline derives from "<project_name>-<service>", with
+# the AWS length limit of each
+GENERATED_NAMES = [
+    ("{name}-codepipeline-role", 64, "IAM role"),
+    ("{name}-codebuild-role", 64, "IAM role"),
+    ("{name}-codepipeline-policy", 128, "IAM role policy"),
+    ("{name}-codebuild-policy", 128, "IAM role policy"),
+    ("{name}-artifacts-{tooling_account_id}", 63, "S3 bucket"),
+    ("alias/{name}-artifact-key", 256, "KMS alias"),
+    ("{name}-app", 100, "CodeCommit repository"),
+    ("{name}-build", 255, "CodeBuild project"),
+    ("{name}-pipeline", 100, "CodePipeline pipeline"),
+    ("{name}-app-stack", 128, "CloudFormation stack"),
+]
+
+def name_problems(service_name, tfvars):
+    """List the generated resource names of a service that exceed their AWS limit."""
+    values = {
+        "name": f"{tfvars['project_name']}-{service_name}",
+        "tooling_account_id": tfvars["tooling_account_id"],
+    }
+    problems = []
+    for pattern, limit, kind in GENERATED_NAMES:
+        generated = pattern.format(**values)
+        if len(generated) > limit:
+            problems.append(f"{kind} name {generated} is {len(generated)} characters (limit {limit})")
+    return problems
+
+def load_services(services_file, tfvars):
+    """Load the declarative service list.
+
+    Each entry needs a name and can override the branch that triggers
+    its pipeline and the CodeBuild compute type. Names are checked
+    against the AWS limits of the resource names generated from them.
+    """
+    try:
+        with open(services_file) as f:
+            services = json.load(f)
+    except FileNotFoundError:
+        print(f"❌ Error: {services_file} not found")
+        print('   Create it with a list of services, e.g. [{"name": "orders"}]')
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(f"❌ Error: Invalid JSON in {services_file}: {e}")
+        sys.exit(1)
+
+    if not isinstance(services, list) or not all(isinstance(service, dict) for service in services):
+        print(f"❌ Error: {services_file} must be a list of services, e.g. [{{\"name\": \"orders\"}}]")
+        sys.exit(1)
+
+    names = set()
+    for service in services:
+        name = service.get("name", "")
+        if not isinstance(name, str) or not SERVICE_NAME_PATTERN.fullmatch(name):
+            print(f"❌ Error: Invalid service name {name!r}: use lowercase letters, digits and dashes, starting with a letter")
+            sys.exit(1)
+        if len(name) > SERVICE_NAME_MAX_LENGTH:
+            print(f"❌ Error: Service name {name!r} is {len(name)} characters, at most {SERVICE_NAME_MAX_LENGTH} are allowed")
+            sys.exit(1)
+        if name in names:
+            print(f"❌ Error: Service {name} is listed twice in {services_file}")
+            sys.exit(1)
+        problems = name_problems(name, tfvars)
+        if problems:
+            print(f"❌ Error: Service name {name!r} is too long for project {tfvars['project_name']}:")
+            for problem in problems:
+                print(f"   {problem}")
+            sys.exit(1)
+        names.add(name)
+    return [{**SERVICE_DEFAULTS, **service} for service in services]
+
+def render_service(service):
+    """Render the Terraform stack for one service."""
+    return render_template(
+        SERVICE_TEMPLATE,
+        service_name=service["name"],
+        branch_name=service["branch"],
+        build_compute_type=service["build_compute_type"],
+    )
+
+def stack_digest(content, shared_inputs):
+    """Digest of everything a service's plan depends on besides its state."""
+    digest = hashlib.sha256(content.encode())
+    digest.update(shared_inputs.encode())
+    return digest.hexdigest()
+
+def load_render_cache():
+    try:
+        with open(RENDER_CACHE_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_render_cache(cache):
+    temp_file = RENDER_CACHE_FILE.with_suffix(".tmp")
+    with open(temp_file, "w") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(temp_file, RENDER_CACHE_FILE)
+
+def write_stack(service_dir, content):
+    """Write a service's main.tf, leaving it untouched if nothing changed."""
+    main_config = service_dir / "main.tf"
+    if main_config.exists() and main_config.read_text() == content:
+        return False
+    service_dir.mkdir(parents=True, exist_ok=True)
+    temp_config = service_dir / "main.tf.tmp"
+    temp_config.write_text(content)
+    os.replace(temp_config, main_config)
+    return True
+
+def service_outputs():
+    """Return the outputs of every applied service stack, by service name."""
+    outputs = {}
+    for outputs_file in sorted(SERVICES_DIR.glob("*/outputs.json")):
+        try:
+            with open(outputs_file) as f:
+                outputs[outputs_file.parent.name] = json.load(f)
+        except json.JSONDecodeError:
+            continue
+    return outputs
+
+def plan_service(name):
+    """Plan one service stack; returns (name, error or None)."""
+    service_dir = SERVICES_DIR / name
+    output = []
+    with env_lock(service_dir):
+        plan_cmd, refresh = plan_command(service_dir, "full", ["-input=false"])
+        returncode, _ = run_terraform(plan_cmd, cwd=service_dir, refresh=refresh, quiet=True, check=False, output=output)
+    if returncode != 0:
+        return name, "".join(output[-20:]).strip()
+    return name, None
+
+def main():
+    parser = argparse.ArgumentParser(description="Render one pipeline stack per service and plan the changed ones")
+    parser.add_argument(
+        "--services", default=SERVICES_FILE,
+        help=f"JSON list of services (default: {SERVICES_FILE})"
+    )
+    parser.add_argument("--plan", action="store_true", help="plan every service whose stack changed")
+    parser.add_argument("--force", action="store_true", help="treat every service as changed")
+    parser.add_argument("--jobs", type=int, default=4, help="services planned at once (default: 4)")
+    args = parser.parse_args()
+
+    print("🧩 Service Pipeline Generator")
+    print("=" * 45)
+
+    try:
+        tfvars = load_tfvars()
+        tfvars = {key: tfvars[key] for key in ("project_name", "tooling_account_id")}
+    except (OSError, KeyError, TfvarsError) as e:
+        print(f"❌ Error: Could not read project_name and tooling_account_id from terraform.tfvars: {e}")
+        sys.exit(1)
+
+    services = load_services(args.services, tfvars)
+
+    # Every stack shares the pipeline module and the tfvars, so a change
+    # to either invalidates all of them
+    shared_inputs = f"{dir_digest('modules/pipeline')}:{file_digest('terraform.tfvars')}"
+
+    cache = load_render_cache()
+    changed = []
+    try:
+        for service in services:
+            name = service["name"]
+            content = render_service(service)
+            digest = stack_digest(content, shared_inputs)
+            if write_stack(SERVICES_DIR / name, content):
+                print(f"  → Rendered services/{name}/main.tf")
+            if args.force or cache.get(name, {}).get("digest") != digest:
+                changed.append((name, digest))
+    except (OSError, TemplateError) as e:
+        print(f"❌ Error: Could not render {SERVICE_TEMPLATE}: {e}")
+        sys.exit(1)
+
+    print(f"  → {len(services)} services, {len(changed)} changed since their last plan")
+
+    # Stacks are never deleted here: they may still own deployed resources
+    listed = {service["name"] for service in services}
+    for service_dir in sorted(SERVICES_DIR.glob("*/main.tf")):
+        if service_dir.parent.name not in listed:
+            print(f"  ⚠️  services/{service_dir.parent.name} is no longer listed; destroy it before removing the directory")
+    for name in set(cache) - listed:
+        del cache[name]
+
+    if not args.plan:
+        for name, _ in changed:
+            print(f"    ~ {name}")
+        save_render_cache(cache)
+        if changed:
+            print("\n👉 Run with --plan to plan the changed services")
+        return
+
+    # Reuse downloaded providers across service stacks; init writes the
+    # plugin cache, so it runs one stack at a time
+    PLUGIN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    os.environ.setdefault("TF_PLUGIN_CACHE_DIR", str(PLUGIN_CACHE_DIR))
+    os.environ.setdefault("TF_IN_AUTOMATION", "1")
+    for name, _ in changed:
+        service_dir = SERVICES_DIR / name
+        if not (service_dir / ".terraform" / "modules" / "modules.json").exists():
+            print(f"  → Initializing {name}...")
+            with env_lock(service_dir):
+                run_command(["terraform", "init", "-input=false"], cwd=service_dir)
+
+    print(f"  → Planning {len(changed)} services...")
+    digests = dict(changed)
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        results = list(executor.map(plan_service, digests))
+
+    failed = False
+    for name, error in results:
+        if error:
+            failed = True
+            print(f"\n❌ {name}: plan failed")
+            for line in error.splitlines():
+                print(f"    {line}")
+        else:
+            cache[name] = {
+                "digest": digests[name],
+                "planned_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            print(f"  ✅ {name}: planned to services/{name}/tfplan")
+    save_render_cache(cache)
+
+    if failed:
+        sys.exit(1)
+    if changed:
+        print("\n👉 Next Steps:")
+        print("  1. Apply each plan: terraform -chdir=services/<name> apply tfplan")
+        print("  2. Save its outputs: terraform -chdir=services/<name> output -json > services/<name>/outputs.json")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timezone
+
+from tfvars import TfvarsError, load_tfvars
+from watch_pipeline import FINAL_STATUSES, load_pipeline_name
+
+EXECUTION_MODES = ["SUPERSEDED", "QUEUED", "PARALLEL"]
+DEFAULT_STAGES = [("Source", 5.0), ("Build", 90.0), ("Deploy", 60.0)]
+BRANCH = "main"
+PERCENTILES = [50, 90, 99]
+
+def commit_schedule(count, interval, poisson=False, seed=0):
+    """Return the offset in seconds of each commit from the start of the storm.
+
+    Commits are evenly spaced, or arrive as a Poisson process with the
+    same mean interval. An interval of 0 pushes them all at once.
+    """
+    rng = random.Random(seed)
+    offsets, offset = [], 0.0
+    for _ in range(count):
+        offsets.append(offset)
+        if interval > 0:
+            offset += rng.expovariate(1 / interval) if poisson else interval
+    return offsets
+
+def push_commits(codecommit, repository, schedule, clock, sleep, run_id):
+    """Push one synthetic commit per scheduled offset; returns [(commit_id, pushed_at)]."""
+    parent = codecommit.get_branch(repositoryName=repository, branchName=BRANCH)["branch"]["commitId"]
+    started = clock()
+    commits = []
+    for number, offset in enumerate(schedule, 1):
+        wait = offset - (clock() - started).total_seconds()
+        if wait > 0:
+            sleep(wait)
+        pushed_at = clock()
+        response = codecommit.put_file(
+            repositoryName=repository,
+            branchName=BRANCH,
+            fileContent=f"{run_id} commit {number} at {pushed_at.isoformat()}\n".encode(),
+            filePath=f"loadtest/{run_id}.txt",
+            parentCommitId=parent,
+            commitMessage=f"Load test {run_id}: commit {number}/{len(schedule)}",
+            name="pipeline load test",
+            email="loadtest@example.com",
+        )
+        parent = response["commitId"]
+        commits.append((parent, pushed_at))
+    return commits
+
+def list_executions(codepipeline, pipeline_name, since):
+    """Return the summaries of every execution started at or after since."""
+    executions = []
+    kwargs = {"pipelineName": pipeline_name, "maxResults": 100}
+    while True:
+        response = codepipeline.list_pipeline_executions(**kwargs)
+        for execution in response["pipelineExecutionSummaries"]:
+            if execution["startTime"] < since:
+                return executions
+            executions.append(execution)
+        if not response.get("nextToken"):
+            return executions
+        kwargs["nextToken"] = response["nextToken"]
+
+def _revision(execution):
+    revisions = execution.get("sourceRevisions") or [{}]
+    return revisions[0].get("revisionId")
+
+def wait_for_executions(codepipeline, pipeline_name, commits, clock, sleep, interval, timeout):
+    """Poll until every execution for the pushed commits has finished.
+
+    A commit may never get an execution of its own when the source
+    action picks up several commits at once, so this waits on the
+    executions that exist rather than on one per commit.
+    """
+    commit_ids = {commit_id for commit_id, _ in commits}
+    since = commits[0][1]
+    deadline = clock().timestamp() + timeout
+    while True:
+        executions = [e for e in list_executions(codepipeline, pipeline_name, since) if _revision(e) in commit_ids]
+        pending = [e for e in executions if e["status"] not in FINAL_STATUSES]
+        # The last commit always gets an execution once the trigger fires
+        started = {_revision(e) for e in executions}
+        if not pending and commits[-1][0] in started:
+            return executions, False
+        if clock().timestamp() >= deadline:
+            return executions, True
+        sleep(interval)
+
+def percentile(values, p):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+def summarize(commits, executions):
+    """Count executions by outcome and measure per-commit delivery latency.
+
+    A commit counts as delivered by the first successful execution of it
+    or of any later commit, since history is linear; superseded commits
+    are therefore still delivered, just later.
+    """
+    index = {commit_id: number for number, (commit_id, _) in enumerate(commits)}
+    summary = {"commits": len(commits), "started": len(executions), "statuses": {}}
+    for execution in executions:
+        summary["statuses"][execution["status"]] = summary["statuses"].get(execution["status"], 0) + 1
+
+    succeeded = sorted(
+        (e["lastUpdateTime"], index[_revision(e)]) for e in executions if e["status"] == "Succeeded"
+    )
+
+    # A deploy of an older commit after a newer one rolls the stack back
+    summary["out_of_order"] = 0
+    newest = -1
+    for _, number in succeeded:
+        if number < newest:
+            summary["out_of_order"] += 1
+        newest = max(newest, number)
+
+    latencies = []
+    for number, (_, pushed_at) in enumerate(commits):
+        delivered = next((finished for finished, shipped in succeeded if shipped >= number), None)
+        if delivered is not None:
+            latencies.append((delivered - pushed_at).total_seconds())
+    summary["latencies"] = latencies
+    summary["undelivered"] = len(commits) - len(latencies)
+    return summary
+
+def _duration(seconds):
+    if seconds is None:
+        return "-"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}m{seconds:02d}s" if minutes else f"{seconds}s"
+
+def _latency(summary, p):
+    return _duration(percentile(summary["latencies"], p)) if summary["latencies"] else None
+
+def display_summary(summary):
+    """Display the outcome of one load test run."""
+    statuses = summary["statuses"]
+    print("\n" + "="*60)
+    print("📊 Load Test Results")
+    print("="*60)
+    print(f"  Commits pushed:       {summary['commits']}")
+    print(f"  Executions started:   {summary['started']}")
+    for status in ["Succeeded", "Superseded", "Failed", "Stopped", "InProgress"]:
+        if statuses.get(status):
+            print(f"    {status + ':':<20} {statuses[status]}")
+    print(f"  Out-of-order deploys: {summary['out_of_order']}")
+    print(f"  Undelivered commits:  {summary['undelivered']}")
+    if summary["latencies"]:
+        print("  Commit → deployed latency:")
+        for p in PERCENTILES:
+            print(f"    p{p:<19} {_latency(summary, p)}")
+        print(f"    {'max':<20} {_duration(max(summary['latencies']))}")
+
+def display_comparison(rows):
+    """Display one line per emulated mode and build concurrency."""
+    print("\n" + "="*86)
+    print("📊 Emulated Load Test Results")
+    print("="*86)
+    header = f"{'Mode':<11} {'Limit':>5} {'Peak':>4} {'Started':>8} {'Superseded':>10} {'Succeeded':>9} {'Stale':>5}"
+    header += "".join(f" {'p' + str(p):>7}" for p in PERCENTILES) + f" {'Build wait p90':>14}"
+    print(header)
+    print("-" * len(header))
+    for mode, concurrency, summary, pipeline in rows:
+        statuses = summary["statuses"]
+        line = (
+            f"{mode:<11} {concurrency:>5} {pipeline.peak_builds:>4} {summary['started']:>8} "
+            f"{statuses.get('Superseded', 0):>10} {statuses.get('Succeeded', 0):>9} {summary['out_of_order']:>5}"
+        )
+        line += "".join(f" {_latency(summary, p) or '-':>7}" for p in PERCENTILES)
+        wait = percentile(pipeline.build_waits, 90) if pipeline.build_waits else None
+        print(line + f" {_duration(wait):>14}")
+    print("\nLimit and Peak are the allowed and observed concurrent builds; Stale counts deploys of an")
+    print("older commit after a newer one, which roll the application back.")
+
+    # Out-of-order deploys are never acceptable, whatever the latency
+    candidates = [row for row in rows if row[2]["latencies"] and not row[2]["undelivered"] and not row[2]["out_of_order"]]
+    if candidates:
+        mode, concurrency, summary, pipeline = min(
+            candidates, key=lambda row: (percentile(row[2]["latencies"], 90), row[3].peak_builds)
+        )
+        print(f"\n💡 Lowest p90 latency without stale deploys: {mode} with a limit of {concurrency} concurrent build(s)")
+
+def run_local(args, schedule, stages):
+    """Replay the commit storm against the emulator for each mode and concurrency."""
+    from local_standins import LocalCodeCommit, LocalCodePipeline, VirtualClock
+
+    rows = []
+    for mode in args.mode or EXECUTION_MODES:
+        for concurrency in (args.build_concurrency if mode == "PARALLEL" else [1]):
+            clock = VirtualClock()
+            pipeline = LocalCodePipeline(
+                stages, execution_mode=mode, build_concurrency=concurrency,
+                clock=clock, jitter=args.jitter, seed=args.seed
+            )
+            codecommit = LocalCodeCommit(on_commit=pipeline.on_commit)
+            commits = push_commits(codecommit, "local-app", schedule, clock, clock.sleep, "local")
+            executions, _ = wait_for_executions(
+                pipeline, "local-pipeline", commits, clock, clock.sleep, args.poll_interval, float("inf")
+            )
+            rows.append((mode, concurrency, summarize(commits, executions), pipeline))
+    display_comparison(rows)
+
+def run_aws(args, schedule, repository):
+    """Push the commit storm to the deployed repository and measure the real pipeline."""
+    import boto3
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    pipeline_name = load_pipeline_name()
+    session = boto3.Session(profile_name="tooling")
+    codecommit = session.client("codecommit")
+    codepipeline = session.client("codepipeline")
+    clock = lambda: datetime.now(timezone.utc)
+
+    try:
+        pipeline = codepipeline.get_pipeline(name=pipeline_name)["pipeline"]
+        print(f"  → Pipeline {pipeline_name} ({pipeline.get('executionMode', 'SUPERSEDED')})")
+
+        run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+        print(f"  → Pushing {len(schedule)} commits to {repository}/{BRANCH} over {_duration(schedule[-1])}...")
+        commits = push_commits(codecommit, repository, schedule, clock, time.sleep, run_id)
+
+        print("  → Waiting for executions to finish...")
+        executions, timed_out = wait_for_executions(
+            codepipeline, pipeline_name, commits, clock, time.sleep, args.poll_interval, args.timeout
+        )
+    except (BotoCoreError, ClientError) as e:
+        print(f"❌ Error during load test: {e}")
+        sys.exit(1)
+
+    if timed_out:
+        print(f"  ⚠️  Timed out after {args.timeout}s; unfinished executions count as InProgress")
+    display_summary(summarize(commits, executions))
+
+def parse_stages(value):
+    """Parse Source=5,Build=90,Deploy=60 into [(name, seconds)]."""
+    stages = []
+    for item in value.split(","):
+        name, _, seconds = item.partition("=")
+        try:
+            stages.append((name.strip(), float(seconds)))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid stage duration: {item!r}")
+    return stages
+
+def positive_seconds(value):
+    """Parse a number of seconds that must be greater than zero."""
+    try:
+        seconds = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number of seconds: {value!r}")
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {seconds}")
+    return seconds
+
+def main():
+    parser = argparse.ArgumentParser(description="Push a storm of commits and measure pipeline throughput")
+    parser.add_argument("--commits", type=int, default=20, help="number of commits to push (default: 20)")
+    parser.add_argument(
+        "--interval", type=float, default=30,
+        help="mean seconds between commits, 0 for all at once (default: 30)"
+    )
+    parser.add_argument("--poisson", action="store_true", help="randomize commit arrivals around the interval")
+    parser.add_argument("--seed", type=int, default=0, help="seed for arrivals and emulated durations")
+    parser.add_argument(
+        "--local", action="store_true",
+        help="run against the local repository and pipeline emulator instead of AWS"
+    )
+    parser.add_argument("--mode", action="append", choices=EXECUTION_MODES, help="emulated execution mode (repeatable)")
+    parser.add_argument(
+        "--build-concurrency", type=int, action="append",
+        help="emulated concurrent build limit for PARALLEL (repeatable, default: 1 2 4)"
+    )
+    parser.add_argument(
+        "--stages", type=parse_stages, default=DEFAULT_STAGES,
+        help="emulated stage durations in seconds (default: Source=5,Build=90,Deploy=60)"
+    )
+    parser.add_argument("--jitter", type=float, default=0.2, help="emulated duration jitter (default: 0.2)")
+    parser.add_argument("--poll-interval", type=positive_seconds, default=15, help="seconds between status polls (default: 15)")
+    parser.add_argument("--timeout", type=int, default=3600, help="stop waiting this long after the last push")
+    parser.add_argument("--yes", action="store_true", help="do not ask for confirmation")
+    args = parser.parse_args()
+    args.build_concurrency = args.build_concurrency or [1, 2, 4]
+
+    print("🌩️  Pipeline Load Test")
+    print("=" * 45)
+
+    if args.commits < 1:
+        print("❌ Error: --commits must be at least 1")
+        sys.exit(1)
+
+    schedule = commit_schedule(args.commits, args.interval, args.poisson, args.seed)
+
+    if args.local:
+        print(f"  → Emulating {args.commits} commits over {_duration(schedule[-1])}")
+        run_local(args, schedule, args.stages)
+        return
+
+    try:
+        repository = f"{load_tfvars()['project_name']}-app"
+    except (OSError, KeyError, TfvarsError) as e:
+        print(f"❌ Error: Could not read project_name from terraform.tfvars: {e}")
+        sys.exit(1)
+
+    if not args.yes:
+        answer = input(
+            f"This pushes {args.commits} commits to {repository}/{BRANCH} and deploys each one to prod. "
+            "Type 'yes' to continue: "
+        )
+        if answer.strip() != "yes":
+            print("❌ Aborted")
+            sys.exit(1)
+
+    run_aws(args, schedule, repository)
+
+if __name__ == "__main__":
+    main()
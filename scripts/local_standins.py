@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+import json
+import heapq
+import random
+import hashlib
+import itertools
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+class LocalCodeBuild:
+    """Stand-in for the CodeBuild client, backed by <dir>/builds.json.
+
+    The file holds {"builds": [...]} in the shape batch_get_builds returns,
+    with ISO timestamps. It is re-read on every call, so a test or a
+    script can advance a build while it is being watched.
+    """
+
+    def __init__(self, root):
+        self.builds_file = Path(root) / "builds.json"
+
+    def _builds(self):
+        with open(self.builds_file) as f:
+            builds = json.load(f)["builds"]
+        for build in builds:
+            for key in ("startTime", "endTime"):
+                if build.get(key):
+                    build[key] = datetime.fromisoformat(build[key])
+            for phase in build.get("phases", []):
+                for key in ("startTime", "endTime"):
+                    if phase.get(key):
+                        phase[key] = datetime.fromisoformat(phase[key])
+        return builds
+
+    def list_builds_for_project(self, projectName, sortOrder="DESCENDING", **kwargs):
+        builds = [b for b in self._builds() if b["projectName"] == projectName]
+        builds.sort(key=lambda b: b["startTime"], reverse=sortOrder == "DESCENDING")
+        return {"ids": [b["id"] for b in builds]}
+
+    def batch_get_builds(self, ids):
+        by_id = {b["id"]: b for b in self._builds()}
+        return {
+            "builds": [by_id[i] for i in ids if i in by_id],
+            "buildsNotFound": [i for i in ids if i not in by_id],
+        }
+
+class ResourceNotFoundException(Exception):
+    """Raised like the CloudWatch Logs error of the same name, with its response shape."""
+
+    def __init__(self, message):
+        super().__init__(f"An error occurred (ResourceNotFoundException): {message}")
+        self.response = {"Error": {"Code": "ResourceNotFoundException", "Message": message}}
+
+class LocalLogs:
+    """Stand-in for the CloudWatch Logs client, backed by <dir>/logs/<stream>.log.
+
+    Each line is either JSON {"timestamp": ms, "message": ...} or plain
+    text, which gets the file's modification time. Forward tokens are line
+    offsets and, as in CloudWatch, the same token comes back when there
+    are no new events. A missing file is a missing stream, which raises
+    ResourceNotFoundException as CloudWatch does.
+    """
+
+    exceptions = SimpleNamespace(ResourceNotFoundException=ResourceNotFoundException)
+
+    def __init__(self, root):
+        self.logs_dir = Path(root) / "logs"
+
+    def get_log_events(self, logGroupName, logStreamName, startFromHead=True, nextToken=None, limit=10000, **kwargs):
+        log_file = self.logs_dir / f"{logStreamName.replace('/', '_')}.log"
+        start = int(nextToken.split("/", 1)[1]) if nextToken else 0
+        try:
+            lines = log_file.read_text().splitlines()
+            mtime = int(log_file.stat().st_mtime * 1000)
+        except FileNotFoundError:
+            raise ResourceNotFoundException("The specified log stream does not exist.") from None
+
+        events = []
+        for line in lines[start:start + limit]:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                event = {"timestamp": mtime, "message": line}
+            events.append({**event, "ingestionTime": event["timestamp"]})
+
+        end = start + len(events)
+        return {"events": events, "nextForwardToken": f"f/{end}", "nextBackwardToken": f"b/{start}"}
+
+class VirtualClock:
+    """Simulated clock for the emulators below; sleep() advances it instantly."""
+
+    def __init__(self, start=None):
+        self.seconds = (start or datetime.now(timezone.utc)).timestamp()
+
+    def __call__(self):
+        return datetime.fromtimestamp(self.seconds, tz=timezone.utc)
+
+    def sleep(self, seconds):
+        self.seconds += max(0.0, seconds)
+
+class LocalCodeCommit:
+    """In-memory stand-in for the CodeCommit client's branch and put_file calls.
+
+    on_commit(branch, commit_id) is called after every commit, the way the
+    source change trigger starts the pipeline.
+    """
+
+    def __init__(self, on_commit=None):
+        self.on_commit = on_commit
+        self.branches = {"main": None}
+
+    def get_branch(self, repositoryName, branchName):
+        if branchName not in self.branches:
+            raise KeyError(f"BranchDoesNotExistException: {branchName}")
+        return {"branch": {"branchName": branchName, "commitId": self.branches[branchName]}}
+
+    def put_file(self, repositoryName, branchName, fileContent, filePath, parentCommitId=None, **kwargs):
+        if parentCommitId != self.branches.get(branchName):
+            raise ValueError(f"ParentCommitIdOutdatedException: {parentCommitId} is not the tip of {branchName}")
+        commit_id = hashlib.sha1(f"{parentCommitId}:{filePath}:".encode() + fileContent).hexdigest()
+        self.branches[branchName] = commit_id
+        if self.on_commit:
+            self.on_commit(branchName, commit_id)
+        return {"commitId": commit_id, "blobId": hashlib.sha1(fileContent).hexdigest(), "treeId": commit_id}
+
+class LocalCodePipeline:
+    """Discrete-event emulator of a CodePipeline V2 pipeline and its CodeBuild project.
+
+    stages is a list of (name, seconds); each run of a stage takes that
+    long, +/- jitter. Execution modes follow CodePipeline:
+
+    - SUPERSEDED: one execution per stage; a newer execution waiting to
+      enter a stage replaces the one already waiting there.
+    - QUEUED: one execution per stage; waiting executions keep their order.
+    - PARALLEL: executions run independently; only the build stage is
+      limited, by build_concurrency, and builds queue like in CodeBuild.
+
+    State is advanced lazily to clock() on every call.
+    """
+
+    def __init__(self, stages, execution_mode="SUPERSEDED", build_concurrency=1,
+                 build_stage="Build", clock=None, jitter=0.2, seed=0):
+        self.stages = stages
+        self.execution_mode = execution_mode
+        self.build_stage = build_stage
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.executions = {}
+        self.peak_builds = 0
+        self.build_waits = []
+        self._events = []
+        self._sequence = itertools.count()
+        self._lanes = []
+        for name, _ in stages:
+            capacity = float("inf") if execution_mode == "PARALLEL" else 1
+            if name == build_stage:
+                capacity = min(capacity, build_concurrency)
+            self._lanes.append({"capacity": capacity, "running": set(), "waiting": []})
+
+    def on_commit(self, branch, commit_id, watched_branch="main"):
+        if branch == watched_branch:
+            self._advance()
+            self.start_execution(commit_id)
+
+    def start_execution(self, revision):
+        at = self.clock().timestamp()
+        execution_id = f"local-{len(self.executions) + 1:05d}"
+        self.executions[execution_id] = {
+            "id": execution_id,
+            "revision": revision,
+            "status": "InProgress",
+            "start": at,
+            "updated": at,
+            "entered": at,
+        }
+        self._enter(at, self.executions[execution_id], 0)
+        return execution_id
+
+    def _advance(self):
+        now = self.clock().timestamp()
+        while self._events and self._events[0][0] <= now:
+            at, _, execution_id, stage = heapq.heappop(self._events)
+            self._finish_stage(at, self.executions[execution_id], stage)
+
+    def _end(self, at, execution, status):
+        execution["status"] = status
+        execution["updated"] = at
+
+    def _enter(self, at, execution, stage):
+        lane = self._lanes[stage]
+        execution["entered"] = at
+        execution["updated"] = at
+        if len(lane["running"]) < lane["capacity"]:
+            self._run(at, execution, stage)
+        elif self.execution_mode == "SUPERSEDED":
+            for waiting in lane["waiting"]:
+                self._end(at, waiting, "Superseded")
+            lane["waiting"] = [execution]
+        else:
+            lane["waiting"].append(execution)
+
+    def _run(self, at, execution, stage):
+        lane = self._lanes[stage]
+        lane["running"].add(execution["id"])
+        name, seconds = self.stages[stage]
+        if name == self.build_stage:
+            self.peak_builds = max(self.peak_builds, len(lane["running"]))
+            self.build_waits.append(at - execution["entered"])
+        seconds *= self.random.uniform(1 - self.jitter, 1 + self.jitter)
+        heapq.heappush(self._events, (at + seconds, next(self._sequence), execution["id"], stage))
+
+    def _finish_stage(self, at, execution, stage):
+        lane = self._lanes[stage]
+        lane["running"].discard(execution["id"])
+        if stage + 1 < len(self.stages):
+            self._enter(at, execution, stage + 1)
+        else:
+            self._end(at, execution, "Succeeded")
+        if lane["waiting"]:
+            self._run(at, lane["waiting"].pop(0), stage)
+
+    def _summary(self, execution):
+        return {
+            "pipelineExecutionId": execution["id"],
+            "status": execution["status"],
+            "startTime": datetime.fromtimestamp(execution["start"], tz=timezone.utc),
+            "lastUpdateTime": datetime.fromtimestamp(execution["updated"], tz=timezone.utc),
+            "sourceRevisions": [{"actionName": self.stages[0][0], "revisionId": execution["revision"]}],
+        }
+
+    def get_pipeline(self, name):
+        return {"pipeline": {"name": name, "pipelineType": "V2", "executionMode": self.execution_mode}}
+
+    def list_pipeline_executions(self, pipelineName, maxResults=100, nextToken=None):
+        self._advance()
+        executions = sorted(self.executions.values(), key=lambda e: (e["start"], e["id"]), reverse=True)
+        start = int(nextToken) if nextToken else 0
+        page = executions[start:start + maxResults]
+        response = {"pipelineExecutionSummaries": [self._summary(e) for e in page]}
+        if start + maxResults < len(executions):
+            response["nextToken"] = str(start + maxResults)
+        return response
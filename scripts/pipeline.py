@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Single entry point for the cross-account pipeline scripts.
+
+Each subcommand lives in its own module and is only imported when it is
+run, so local checks never pay for importing boto3 or the other
+subcommands. Usage: python scripts/pipeline.py <command> [target] [options]
+"""
+import sys
+import importlib
+
+# command -> (module, description), or command -> {target: (module, description)}
+COMMANDS = {
+    "deploy": {
+        "phase1": ("deploy_phase1_roles", "Deploy IAM roles without policies"),
+        "phase2": ("deploy_phase2_pipeline", "Deploy the pipeline in the tooling account"),
+        "phase3": ("deploy_phase3_policies", "Attach the complete IAM policies"),
+    },
+    "validate": {
+        "setup": ("validate_setup", "Check profiles, directories and terraform.tfvars"),
+        "phase1": ("validate_phase1", "Check the Phase 1 IAM roles"),
+        "pipeline": ("validate_pipeline", "Check all resources and cross-account access"),
+    },
+    "services": ("generate_services", "Render a pipeline stack per service and plan changes"),
+    "policy-check": ("policy_check", "Offline IAM pre-flight permission matrix"),
+    "drift": ("drift", "Detect drift in all environments concurrently"),
+    "watch": ("watch_pipeline", "Follow the latest pipeline execution"),
+    "logs": ("build_logs", "Tail the latest CodeBuild build log"),
+    "artifacts": ("artifact_report", "Artifact sizes, transfer and KMS requests per execution"),
+    "loadtest": ("load_test", "Push a commit storm and measure pipeline throughput"),
+    "benchmark": ("benchmark_refresh", "Benchmark Terraform refresh modes"),
+    "teardown": ("teardown", "Destroy both environments"),
+}
+
+def print_usage():
+    print("usage: pipeline.py <command> [target] [options]\n")
+    print("commands:")
+    for command, entry in COMMANDS.items():
+        if isinstance(entry, dict):
+            for target, (_, description) in entry.items():
+                print(f"  {command + ' ' + target:<20} {description}")
+        else:
+            print(f"  {command:<20} {entry[1]}")
+    print("\nRun `pipeline.py <command> [target] --help` for command options.")
+
+def resolve(argv):
+    """Return (module name, program name, remaining args) for a command line."""
+    if not argv or argv[0] not in COMMANDS:
+        return None
+    command, rest = argv[0], argv[1:]
+    entry = COMMANDS[command]
+    if not isinstance(entry, dict):
+        return entry[0], command, rest
+    if not rest or rest[0] not in entry:
+        return None
+    return entry[rest[0]][0], f"{command} {rest[0]}", rest[1:]
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in ("-h", "--help"):
+        print_usage()
+        return
+
+    resolved = resolve(argv)
+    if resolved is None:
+        print_usage()
+        sys.exit(2)
+
+    module_name, prog, args = resolved
+    # Subcommand modules parse sys.argv themselves, as when run directly
+    sys.argv = [f"pipeline.py {prog}", *args]
+    importlib.import_module(module_name).main()
+
+if __name__ == "__main__":
+    main()
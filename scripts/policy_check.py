@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+from tfvars import TfvarsError, load_tfvars
+from workspace import env_lock
+
+# Request context used when evaluating conditions; the pipeline always
+# talks to AWS over TLS
+DEFAULT_CONTEXT = {"aws:SecureTransport": "true"}
+
+# Actions that need the resource policy to grant access even inside one
+# account: KMS key policies and role trust policies
+RESOURCE_POLICY_REQUIRED = ("kms:", "sts:AssumeRole")
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def _wildcard_regex(pattern, ignore_case=True):
+    """Compile an IAM wildcard pattern (* and ?) into a regex.
+
+    Actions match case-insensitively; resource ARNs and string
+    conditions are case-sensitive, so those pass ignore_case=False.
+    """
+    parts = (".*" if c == "*" else "." if c == "?" else re.escape(c) for c in pattern)
+    return re.compile("".join(parts) + r"\Z", re.IGNORECASE if ignore_case else 0)
+
+def arn_account(arn):
+    """Return the account ID field of an ARN, or empty string if it has none."""
+    parts = arn.split(":")
+    return parts[4] if len(parts) > 5 else ""
+
+def _covers(attached_to, resource):
+    """Check whether a resource is the policy's resource or an object inside it."""
+    return resource == attached_to or resource.startswith(attached_to + "/")
+
+def _resource_values(module):
+    """Yield every resource in a planned_values/values module tree."""
+    for resource in module.get("resources", []):
+        yield resource
+    for child in module.get("child_modules", []):
+        yield from _resource_values(child)
+
+def load_show_json(env_path, plan_file=None):
+    """Return `terraform show -json` for a saved plan, or an environment's current state.
+
+    A plan is read from the workspace of a deploy, which already holds the
+    environment's lock; state is read under a shared lock.
+    """
+    if plan_file:
+        result = subprocess.run(
+            ["terraform", "show", "-json", plan_file], cwd=env_path, capture_output=True, text=True, check=True
+        )
+        return json.loads(result.stdout)
+    with env_lock(env_path, exclusive=False):
+        result = subprocess.run(
+            ["terraform", "show", "-json"], cwd=env_path, capture_output=True, text=True, check=True
+        )
+    return json.loads(result.stdout)
+
+def extract_policies(show_json, account_id, fallback_arns=None):
+    """Pull identity, resource and trust policies out of rendered plan or state JSON.
+
+    Returns a list of policy sources, each a dict with the kind of policy,
+    the ARN it is attached to, the account that owns it and the parsed
+    policy document. fallback_arns supplies ARNs that are only known after
+    apply, keyed by resource type.
+    """
+    fallback_arns = fallback_arns or {}
+    root = show_json.get("planned_values", show_json.get("values", {})).get("root_module", {})
+    resources = list(_resource_values(root))
+
+    role_arns = {}
+    for resource in resources:
+        if resource["type"] == "aws_iam_role":
+            name = resource["values"].get("name")
+            role_arns[name] = resource["values"].get("arn") or f"arn:aws:iam::{account_id}:role/{name}"
+
+    sources = []
+    for resource in resources:
+        values = resource.get("values", {})
+        kind = attached_to = document = None
+
+        if resource["type"] == "aws_iam_role_policy":
+            role = values.get("role")
+            kind, attached_to = "identity", role_arns.get(role, f"arn:aws:iam::{account_id}:role/{role}")
+            document = values.get("policy")
+        elif resource["type"] == "aws_iam_role":
+            kind, attached_to = "trust", role_arns[values.get("name")]
+            document = values.get("assume_role_policy")
+        elif resource["type"] == "aws_kms_key":
+            kind, attached_to = "resource", values.get("arn") or fallback_arns.get("aws_kms_key")
+            document = values.get("policy")
+        elif resource["type"] == "aws_s3_bucket_policy":
+            kind, attached_to = "resource", f"arn:aws:s3:::{values.get('bucket')}"
+            document = values.get("policy")
+
+        if not kind:
+            continue
+        if not document or not attached_to:
+            print(f"  ⚠️  {resource['address']}: policy not known until apply, skipped")
+            continue
+        sources.append({
+            "kind": kind,
+            "address": resource["address"],
+            "attached_to": attached_to,
+            "account": account_id,
+            "document": json.loads(document) if isinstance(document, str) else document,
+        })
+    return sources
+
+def build_index(sources):
+    """Index policy statements by action so lookups avoid scanning every policy.
+
+    Exact actions go into a dict; wildcard actions such as kms:ReEncrypt*
+    are grouped by service and matched with a precompiled regex.
+    NotAction statements apply to every action they do not list, so they
+    are kept apart and checked for every lookup; NotResource and
+    NotPrincipal are recorded as negated matches.
+    """
+    index = {"exact": {}, "wildcard": {}, "negated": [], "owners": {}}
+    for source in sources:
+        if source["kind"] != "identity":
+            index["owners"][source["attached_to"]] = source["account"]
+
+        for position, statement in enumerate(_as_list(source["document"].get("Statement"))):
+            not_resource = "NotResource" in statement
+            not_principal = "NotPrincipal" in statement
+            entry = {
+                "source": source,
+                "sid": statement.get("Sid", f"#{position}"),
+                "effect": statement.get("Effect", "Deny"),
+                "resources": [
+                    _wildcard_regex(r, ignore_case=False)
+                    for r in _as_list(statement.get("NotResource" if not_resource else "Resource", "*"))
+                ],
+                "not_resource": not_resource,
+                "principals": statement.get("NotPrincipal" if not_principal else "Principal"),
+                "not_principal": not_principal,
+                "condition": statement.get("Condition", {}),
+            }
+            if "NotAction" in statement:
+                regexes = [_wildcard_regex(a) for a in _as_list(statement["NotAction"])]
+                index["negated"].append((regexes, entry))
+                continue
+            for action in _as_list(statement.get("Action")):
+                action = action.lower()
+                if "*" in action or "?" in action:
+                    service = action.split(":", 1)[0] if ":" in action else "*"
+                    index["wildcard"].setdefault(service, []).append((_wildcard_regex(action), entry))
+                else:
+                    index["exact"].setdefault(action, []).append(entry)
+    return index
+
+def _statements_for(index, action):
+    action = action.lower()
+    service = action.split(":", 1)[0]
+    matches = list(index["exact"].get(action, []))
+    for wildcard_service in (service, "*"):
+        matches.extend(entry for regex, entry in index["wildcard"].get(wildcard_service, []) if regex.match(action))
+    matches.extend(entry for regexes, entry in index["negated"] if not any(r.match(action) for r in regexes))
+    return matches
+
+def _principal_match(principals, principal):
+    """Return 'direct', 'account' or None for how a Principal element names a caller."""
+    if principals == "*":
+        return "direct"
+    if not isinstance(principals, dict):
+        return None
+    if principal.endswith(".amazonaws.com"):
+        return "direct" if principal in _as_list(principals.get("Service")) else None
+
+    account = arn_account(principal)
+    match = None
+    for value in _as_list(principals.get("AWS")):
+        if value == "*" or value == principal:
+            return "direct"
+        if value in (account, f"arn:aws:iam::{account}:root"):
+            match = "account"
+    return match
+
+def _condition_holds(condition, context):
+    """Evaluate the condition operators the pipeline policies use.
+
+    Returns None for unsupported operators; the caller then assumes the
+    worst case, so an unknown condition never turns into an Allow and
+    never hides a Deny.
+    """
+    for operator, tests in condition.items():
+        for key, expected in tests.items():
+            actual = context.get(key)
+            expected = [str(v) for v in _as_list(expected)]
+            if operator == "Bool":
+                if actual is None or str(actual).lower() not in [e.lower() for e in expected]:
+                    return False
+            elif operator == "StringEquals":
+                if actual is None or str(actual) not in expected:
+                    return False
+            elif operator == "StringLike":
+                if actual is None or not any(_wildcard_regex(e, ignore_case=False).match(str(actual)) for e in expected):
+                    return False
+            else:
+                return None
+    return True
+
+def evaluate(index, principal, action, resource, context=None):
+    """Decide whether a principal can perform an action on a resource.
+
+    Follows the IAM cross-account rules: an explicit Deny always wins,
+    cross-account access needs both an identity policy and a resource
+    policy, and KMS keys and role trust require the resource policy even
+    within one account. Returns (allowed, reason).
+    """
+    context = {**DEFAULT_CONTEXT, **(context or {})}
+    is_service = principal.endswith(".amazonaws.com")
+    principal_account = "" if is_service else arn_account(principal)
+
+    identity_allow = resource_direct = resource_account = False
+    for entry in _statements_for(index, action):
+        if any(regex.match(resource) for regex in entry["resources"]) == entry["not_resource"]:
+            continue
+        holds = _condition_holds(entry["condition"], context)
+        if holds is False or (holds is None and entry["effect"] != "Deny"):
+            continue
+
+        source = entry["source"]
+        if source["kind"] == "identity":
+            if source["attached_to"] != principal:
+                continue
+            applies = "direct"
+        else:
+            if not _covers(source["attached_to"], resource):
+                continue
+            applies = _principal_match(entry["principals"], principal)
+            if entry["not_principal"]:
+                # NotPrincipal names who is exempt; everyone else is covered
+                applies = None if applies else "direct"
+            if not applies:
+                continue
+
+        where = f"{source['address']} ({entry['sid']})"
+        if entry["effect"] == "Deny":
+            return False, f"explicit deny in {where}"
+        if source["kind"] == "identity":
+            identity_allow = where
+        elif applies == "direct":
+            resource_direct = where
+        else:
+            resource_account = where
+
+    owner = next(
+        (account for arn, account in index["owners"].items() if _covers(arn, resource)),
+        arn_account(resource)
+    )
+    same_account = not is_service and owner == principal_account
+    needs_resource_policy = action.startswith(RESOURCE_POLICY_REQUIRED)
+
+    if is_service:
+        allowed = bool(resource_direct)
+    elif needs_resource_policy:
+        allowed = bool(resource_direct and (same_account or identity_allow)
+                       or resource_account and identity_allow)
+    elif same_account:
+        allowed = bool(identity_allow or resource_direct)
+    else:
+        allowed = bool(identity_allow and (resource_direct or resource_account))
+
+    grants = [g for g in (identity_allow, resource_direct, resource_account) if g]
+    if allowed:
+        return True, "allowed by " + ", ".join(grants)
+    if not grants:
+        return False, "no statement allows it"
+    if not is_service and not identity_allow and (not same_account or needs_resource_policy):
+        return False, "resource policy allows it, but the principal's identity policy does not"
+    return False, "identity policy allows it, but the resource policy does not"
+
+def required_permissions(tfvars, tooling_outputs):
+    """Build the matrix of every permission the pipeline needs to run."""
+    tooling = tfvars["tooling_account_id"]
+    prod = tfvars["prod_account_id"]
+    project = tfvars["project_name"]
+    region = tfvars["region"]
+
+    bucket_arn = tooling_outputs["artifact_bucket_arn"]["value"]
+    kms_key_arn = tooling_outputs["kms_key_arn"]["value"]
+    artifact = f"{bucket_arn}/{project}-pipeline/source_out/artifact.zip"
+    repo_arn = f"arn:aws:codecommit:{region}:{tooling}:{project}-app"
+    build_arn = f"arn:aws:codebuild:{region}:{tooling}:project/{project}-build"
+    log_group = f"arn:aws:logs:{region}:{tooling}:log-group:/aws/codebuild/{project}-build"
+    stack_arn = f"arn:aws:cloudformation:{region}:{prod}:stack/{project}-app-stack/id"
+
+    pipeline_role = f"arn:aws:iam::{tooling}:role/{project}-codepipeline-role"
+    codebuild_role = f"arn:aws:iam::{tooling}:role/{project}-codebuild-role"
+    cross_account_role = f"arn:aws:iam::{prod}:role/CodePipelineCrossAccountRole"
+    cloudformation_role = f"arn:aws:iam::{prod}:role/CloudFormationDeploymentRole"
+
+    return [
+        ("Pipeline", pipeline_role, "s3:PutObject", artifact),
+        ("Pipeline", pipeline_role, "s3:GetObject", artifact),
+        ("Pipeline", pipeline_role, "s3:GetBucketVersioning", bucket_arn),
+        ("Pipeline", pipeline_role, "kms:GenerateDataKey", kms_key_arn),
+        ("Pipeline", pipeline_role, "kms:Decrypt", kms_key_arn),
+        ("Source", pipeline_role, "codecommit:GetBranch", repo_arn),
+        ("Source", pipeline_role, "codecommit:GetCommit", repo_arn),
+        ("Source", pipeline_role, "codecommit:UploadArchive", repo_arn),
+        ("Source", pipeline_role, "codecommit:GetUploadArchiveStatus", repo_arn),
+        ("Build", pipeline_role, "codebuild:StartBuild", build_arn),
+        ("Build", pipeline_role, "codebuild:BatchGetBuilds", build_arn),
+        ("Build", "codebuild.amazonaws.com", "sts:AssumeRole", codebuild_role),
+        ("Build", codebuild_role, "logs:CreateLogStream", log_group),
+        ("Build", codebuild_role, "s3:GetObject", artifact),
+        ("Build", codebuild_role, "s3:PutObject", artifact),
+        ("Build", codebuild_role, "kms:Decrypt", kms_key_arn),
+        ("Build", codebuild_role, "kms:GenerateDataKey", kms_key_arn),
+        ("Deploy", pipeline_role, "sts:AssumeRole", cross_account_role),
+        ("Deploy", cross_account_role, "s3:GetObject", artifact),
+        ("Deploy", cross_account_role, "s3:PutObject", artifact),
+        ("Deploy", cross_account_role, "kms:Decrypt", kms_key_arn),
+        ("Deploy", cross_account_role, "kms:GenerateDataKey", kms_key_arn),
+        ("Deploy", cross_account_role, "cloudformation:DescribeStacks", stack_arn),
+        ("Deploy", cross_account_role, "cloudformation:CreateStack", stack_arn),
+        ("Deploy", cross_account_role, "cloudformation:UpdateStack", stack_arn),
+        ("Deploy", cross_account_role, "iam:PassRole", cloudformation_role),
+        ("Deploy", "cloudformation.amazonaws.com", "sts:AssumeRole", cloudformation_role),
+        ("Deploy", cloudformation_role, "s3:GetObject", artifact),
+        ("Deploy", cloudformation_role, "kms:Decrypt", kms_key_arn),
+    ]
+
+def load_sources(tfvars, tooling_outputs, show_json=None):
+    """Load the rendered policies of both environments.
+
+    show_json maps an environment to already loaded `terraform show -json`
+    output, e.g. of its plan; the others are read from their state.
+    """
+    accounts = {"prod": tfvars["prod_account_id"], "tooling": tfvars["tooling_account_id"]}
+    fallback_arns = {"aws_kms_key": tooling_outputs["kms_key_arn"]["value"]}
+    show_json = show_json or {}
+
+    sources = []
+    for env_name, account_id in accounts.items():
+        rendered = show_json.get(env_name) or load_show_json(Path(f"environments/{env_name}"))
+        sources.extend(extract_policies(rendered, account_id, fallback_arns))
+    return sources
+
+def run_matrix(index, rows):
+    """Evaluate every row; returns the results and the time it took in ms."""
+    started = time.perf_counter()
+    results = [(row, evaluate(index, *row[1:])) for row in rows]
+    return results, (time.perf_counter() - started) * 1000
+
+def display_matrix(results):
+    """Display the pre-flight matrix grouped by pipeline stage."""
+    stage = None
+    for (row_stage, principal, action, resource), (allowed, reason) in results:
+        if row_stage != stage:
+            stage = row_stage
+            print(f"\n📋 {stage}:")
+        principal_name = principal.split("/")[-1]
+        print(f"  {'✅' if allowed else '❌'} {principal_name} → {action} on {resource}")
+        if not allowed:
+            print(f"      {reason}")
+
+def parse_plan_json(values):
+    plan_json = {}
+    for value in values or []:
+        env_name, _, path = value.partition("=")
+        if env_name not in ("prod", "tooling") or not path:
+            raise argparse.ArgumentTypeError(f"expected prod=FILE or tooling=FILE, got {value}")
+        with open(path) as f:
+            plan_json[env_name] = json.load(f)
+    return plan_json
+
+def check_plan(env_name, env_path, plan_file="tfplan"):
+    """Check the pipeline's permissions against a deploy's saved plan, before apply.
+
+    The plan stands in for env_name's state; the other environment is read
+    from its current state. Prints the denied permissions and returns True
+    when there are none, or when there is nothing to check yet: before
+    Phase 2 there are no artifact bucket and key, before Phase 3 the prod
+    roles have no policies.
+    """
+    print("  → Checking pipeline permissions against the plan...")
+    try:
+        tfvars = load_tfvars()
+        with open("environments/tooling/outputs.json") as f:
+            tooling_outputs = json.load(f)
+    except FileNotFoundError:
+        print("  → No tooling outputs yet, skipping the policy pre-flight check")
+        return True
+    except (OSError, TfvarsError, json.JSONDecodeError) as e:
+        print(f"❌ Error: Could not load the policy pre-flight inputs: {e}")
+        return False
+
+    try:
+        sources = load_sources(tfvars, tooling_outputs, {env_name: load_show_json(env_path, plan_file)})
+    except subprocess.CalledProcessError as e:
+        print(f"❌ terraform show failed: {e.stderr}")
+        return False
+    prod_roles = [s for s in sources if s["kind"] == "identity" and s["account"] == tfvars["prod_account_id"]]
+    if not prod_roles:
+        print("  → The prod roles have no policies yet (Phase 3), skipping the policy pre-flight check")
+        return True
+
+    results, elapsed_ms = run_matrix(build_index(sources), required_permissions(tfvars, tooling_outputs))
+    denied = [(row, result) for row, result in results if not result[0]]
+    display_matrix(denied)
+    print(f"  → {len(results) - len(denied)}/{len(results)} permissions granted ({elapsed_ms:.1f} ms)")
+    return not denied
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline IAM pre-flight checks for the pipeline")
+    parser.add_argument(
+        "--plan-json", action="append", metavar="ENV=FILE",
+        help="check saved `terraform show -json` output, e.g. of a plan, instead of the current state "
+             "(the deploy scripts run this check on their plan before applying)"
+    )
+    parser.add_argument(
+        "--check", nargs=3, metavar=("PRINCIPAL", "ACTION", "RESOURCE"),
+        help="answer a single question instead of running the full matrix"
+    )
+    args = parser.parse_args()
+
+    print("🔐 IAM Policy Pre-flight Check")
+    print("=" * 45)
+
+    try:
+        tfvars = load_tfvars()
+        with open("environments/tooling/outputs.json") as f:
+            tooling_outputs = json.load(f)
+        index = build_index(load_sources(tfvars, tooling_outputs, parse_plan_json(args.plan_json)))
+    except (OSError, TfvarsError, json.JSONDecodeError, argparse.ArgumentTypeError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ terraform show failed: {e.stderr}")
+        sys.exit(1)
+
+    if args.check:
+        rows = [("Check", *args.check)]
+    else:
+        rows = required_permissions(tfvars, tooling_outputs)
+    results, elapsed_ms = run_matrix(index, rows)
+
+    display_matrix(results)
+
+    failed = sum(1 for _, (allowed, _) in results if not allowed)
+    print(f"\n📊 {len(results) - failed}/{len(results)} permissions granted ({elapsed_ms:.1f} ms)")
+    if failed:
+        print("⚠️  Fix the denied permissions before deploying.")
+        sys.exit(1)
+    print("✅ All pipeline permissions line up.")
+
+if __name__ == "__main__":
+    main()
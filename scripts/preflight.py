@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+import re
+import time
+
+from tfvars import TfvarsError, load_tfvars
+
+# AWS profile -> the terraform.tfvars variable holding its account ID
+PROFILE_ACCOUNTS = {"tooling": "tooling_account_id", "prod": "prod_account_id"}
+ACCOUNT_ID_PATTERN = re.compile(r"^\d{12}$")
+
+def expected_accounts(file_path="terraform.tfvars"):
+    """Parse the account IDs each profile should resolve to.
+
+    Returns ({profile: account ID or None}, [problems]).
+    """
+    try:
+        tfvars = load_tfvars(file_path)
+    except FileNotFoundError:
+        return {profile: None for profile in PROFILE_ACCOUNTS}, [f"{file_path} missing"]
+    except (OSError, TfvarsError) as e:
+        return {profile: None for profile in PROFILE_ACCOUNTS}, [f"{file_path} could not be parsed: {e}"]
+
+    expected, problems = {}, []
+    for profile, variable in PROFILE_ACCOUNTS.items():
+        value = tfvars.get(variable)
+        if value is None:
+            problems.append(f"{variable} missing")
+        elif not ACCOUNT_ID_PATTERN.match(str(value)):
+            problems.append(f"{variable} = {value!r} is not a 12-digit account ID")
+            value = None
+        expected[profile] = value
+
+    accounts = [value for value in expected.values() if value]
+    if len(accounts) != len(set(accounts)):
+        problems.append("tooling_account_id and prod_account_id are the same account")
+    return expected, problems
+
+def _identity(profile, loader):
+    import boto3
+    import botocore.session
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    try:
+        # A shared loader parses the STS model once for all profiles
+        core = botocore.session.Session(profile=profile)
+        core.register_component("data_loader", loader)
+        sts = boto3.Session(botocore_session=core).client("sts")
+        return sts.get_caller_identity()["Account"], None
+    except (BotoCoreError, ClientError) as e:
+        return None, str(e)
+
+def check_profiles(profiles):
+    """Resolve every profile's account concurrently: {profile: (account ID, error)}.
+
+    Each profile gets its own session, since sessions are not thread-safe,
+    so the checks take about one STS round-trip in total.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    import botocore.session
+
+    loader = botocore.session.get_session().get_component("data_loader")
+    with ThreadPoolExecutor(max_workers=max(1, len(profiles))) as executor:
+        results = executor.map(lambda profile: _identity(profile, loader), profiles)
+        return dict(zip(profiles, results))
+
+def run_preflight(file_path="terraform.tfvars"):
+    """Check every profile against terraform.tfvars and return all profile failures."""
+    expected, _ = expected_accounts(file_path)
+    failures = []
+
+    started = time.monotonic()
+    results = check_profiles(list(PROFILE_ACCOUNTS))
+    elapsed = time.monotonic() - started
+
+    for profile, (account, error) in results.items():
+        variable = PROFILE_ACCOUNTS[profile]
+        if error:
+            print(f"AWS Profile '{profile}': ❌ Failed: {error}")
+            failures.append(f"profile {profile}: {error}")
+        elif expected[profile] and account != expected[profile]:
+            print(f"AWS Profile '{profile}': ❌ Account {account}, but {variable} is {expected[profile]}")
+            failures.append(f"profile {profile} resolves to {account}, expected {variable} {expected[profile]}")
+        else:
+            print(f"AWS Profile '{profile}': ✅ (Account: {account})")
+    print(f"  → Checked {len(results)} profiles in {elapsed:.1f}s")
+    return failures
+
+def check_configuration(file_path="terraform.tfvars"):
+    """Print the parsed account IDs and return any problems with them."""
+    print("\nConfiguration:")
+    expected, problems = expected_accounts(file_path)
+    for profile, variable in PROFILE_ACCOUNTS.items():
+        if expected[profile]:
+            print(f"  ✅ {variable} = {expected[profile]}")
+    for problem in problems:
+        print(f"  ❌ {problem}")
+    return problems
+
+def report_failures(failures):
+    """Print every collected failure; returns True if there were none."""
+    if not failures:
+        return True
+    print(f"\n❌ {len(failures)} problem(s) found:")
+    for failure in failures:
+        print(f"  - {failure}")
+    return False
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+import re
+import json
+from pathlib import Path
+
+TEMPLATES_DIR = Path("templates")
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+class TemplateError(ValueError):
+    """Raised when a template cannot be rendered."""
+
+def hcl_value(value):
+    """Render a Python value as an HCL literal.
+
+    JSON literals are valid HCL expressions; template sequences in
+    strings are escaped so values are never interpolated by Terraform.
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, (bool, int, float)):
+        return json.dumps(value)
+    if isinstance(value, str):
+        return json.dumps(value).replace("${", "$${").replace("%{", "%%{")
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(hcl_value(item) for item in value) + "]"
+    if isinstance(value, dict):
+        return "{ " + ", ".join(f"{json.dumps(str(k))} = {hcl_value(v)}" for k, v in value.items()) + " }"
+    raise TemplateError(f"cannot render {type(value).__name__} as HCL")
+
+def render_string(template, values):
+    """Replace each {{ name }} in a template with the HCL literal of values[name]."""
+    missing = sorted(set(PLACEHOLDER_PATTERN.findall(template)) - set(values))
+    if missing:
+        raise TemplateError(f"no value for {', '.join(missing)}")
+    return PLACEHOLDER_PATTERN.sub(lambda m: hcl_value(values[m.group(1)]), template)
+
+def render_template(name, **values):
+    """Render a template from the templates directory."""
+    return render_string((TEMPLATES_DIR / name).read_text(), values)
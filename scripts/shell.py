@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+import sys
+import subprocess
+
+def run_command(cmd, cwd=None, capture_output=False):
+    """Run a shell command and handle errors."""
+    print(f"  → Running: {' '.join(cmd)}")
+    try:
+        if capture_output:
+            result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, check=True)
+            return result.stdout
+        else:
+            subprocess.run(cmd, cwd=cwd, check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Command failed: {e}")
+        if capture_output and e.stderr:
+            print(f"Error output: {e.stderr}")
+        sys.exit(1)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+JOURNAL_FILE = ".deploy_journal.json"
+
+def file_digest(path):
+    """Return the SHA-256 of a file, or None if it does not exist."""
+    path = Path(path)
+    if not path.is_file():
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def dir_digest(path, pattern="*.tf"):
+    """Return one SHA-256 over every file matching pattern in a directory."""
+    digest = hashlib.sha256()
+    for file_path in sorted(Path(path).glob(pattern)):
+        digest.update(file_path.name.encode())
+        digest.update((file_digest(file_path) or "").encode())
+    return digest.hexdigest()
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def _write_journal(env_path, journal):
+    """Write the journal atomically so a crash never leaves it half written."""
+    journal_file = Path(env_path) / JOURNAL_FILE
+    temp_file = journal_file.with_suffix(".tmp")
+    with open(temp_file, "w") as f:
+        json.dump(journal, f, indent=2)
+    os.replace(temp_file, journal_file)
+
+def new_journal(env_path, phase):
+    """Start an empty journal for a phase, discarding any previous run."""
+    journal = {"phase": phase, "created_at": _now(), "steps": {}}
+    _write_journal(env_path, journal)
+    return journal
+
+def read_journal(env_path):
+    """Return the journal in an environment directory, or None if there is none."""
+    try:
+        with open(Path(env_path) / JOURNAL_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def load_journal(env_path, phase):
+    """Load the journal for a phase, or start a new one if none matches."""
+    journal = read_journal(env_path)
+    if journal is None or journal.get("phase") != phase:
+        return new_journal(env_path, phase)
+    return journal
+
+def get_step(journal, step):
+    """Return the journal entry for a step, or an empty dict."""
+    return journal["steps"].get(step, {})
+
+def step_is_current(journal, step, inputs):
+    """Check that a step completed with exactly these input digests."""
+    entry = get_step(journal, step)
+    return entry.get("status") == "done" and entry.get("inputs") == inputs
+
+def start_step(env_path, journal, step, inputs, **extra):
+    """Record that a step has started; later steps are no longer valid."""
+    steps = journal["steps"]
+    names = list(steps)
+    if step in names:
+        for name in names[names.index(step):]:
+            del steps[name]
+
+    steps[step] = {"status": "started", "inputs": inputs, "started_at": _now(), **extra}
+    _write_journal(env_path, journal)
+
+def finish_step(env_path, journal, step, outputs=None):
+    """Record that a step completed, along with any output digests."""
+    entry = journal["steps"][step]
+    entry["status"] = "done"
+    entry["outputs"] = outputs or {}
+    entry["finished_at"] = _now()
+    _write_journal(env_path, journal)
+
+def first_incomplete_step(journal, steps):
+    """Return the first step in order that has not completed."""
+    for step in steps:
+        if get_step(journal, step).get("status") != "done":
+            return step
+    return None
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+import sys
+import argparse
+from pathlib import Path
+
+from generate_services import SERVICES_DIR, load_render_cache, save_render_cache, service_outputs
+from shell import run_command
+from workspace import env_lock
+
+# Tooling and the service stacks read prod/outputs.json and their bucket and
+# key policies name the prod roles, so they have to go first
+TEARDOWN_ORDER = ["tooling", "prod"]
+
+def destroy_stack(env_path, label):
+    """Destroy a Terraform stack and remove the plan the deploy scripts saved."""
+    print(f"\n🗑️  Destroying {label}...")
+
+    with env_lock(env_path):
+        print("  → Initializing Terraform...")
+        run_command(["terraform", "init"], cwd=env_path)
+
+        print("  → Destroying resources...")
+        run_command([
+            "terraform", "destroy",
+            "-var-file=../../terraform.tfvars",
+            "-auto-approve"
+        ], cwd=env_path)
+
+    print("  → Removing saved plan...")
+    plan_file = env_path / "tfplan"
+    if plan_file.exists():
+        plan_file.unlink()
+
+    print(f"✅ {label} destroyed")
+
+def main():
+    parser = argparse.ArgumentParser(description="Tear down the cross-account pipeline")
+    parser.add_argument("--yes", action="store_true", help="do not ask for confirmation")
+    args = parser.parse_args()
+
+    print("🧨 Tearing down Cross-Account CI/CD Pipeline")
+    print("=" * 45)
+
+    if not Path("terraform.tfvars").exists():
+        print("❌ Error: terraform.tfvars not found")
+        sys.exit(1)
+
+    # Generated service pipelines that were applied (scripts/generate_services.py)
+    services = list(service_outputs())
+    if services:
+        print(f"  → {len(services)} service pipelines to destroy first: {', '.join(services)}")
+
+    if not args.yes:
+        answer = input("This destroys the pipelines and IAM roles in both accounts. Type 'yes' to continue: ")
+        if answer.strip() != "yes":
+            print("❌ Aborted")
+            sys.exit(1)
+
+    for name in services:
+        destroy_stack(SERVICES_DIR / name, f"service pipeline {name}")
+        # The stack directory stays; forgetting its last plan makes
+        # generate_services plan it again on the next --plan
+        (SERVICES_DIR / name / "outputs.json").unlink()
+        cache = load_render_cache()
+        cache.pop(name, None)
+        save_render_cache(cache)
+
+    for env_name in TEARDOWN_ORDER:
+        destroy_stack(Path(f"environments/{env_name}"), f"{env_name} environment")
+
+    # Outputs are removed last: destroying tooling still reads prod/outputs.json
+    for env_name in TEARDOWN_ORDER:
+        outputs_file = Path(f"environments/{env_name}/outputs.json")
+        if outputs_file.exists():
+            outputs_file.unlink()
+
+    print("\n✨ Teardown complete!")
+
+if __name__ == "__main__":
+    main()
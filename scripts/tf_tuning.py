@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+import os
+import re
+import sys
+import json
+import time
+import fcntl
+import subprocess
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from step_journal import file_digest
+from workspace import shared_env_path
+
+PLUGIN_CACHE_DIR = Path.home() / ".terraform.d" / "plugin-cache"
+
+HISTORY_FILE = ".terraform_runs.json"
+HISTORY_LIMIT = 50
+HISTORY_WINDOW = timedelta(hours=24)
+
+DEFAULT_PARALLELISM = 10
+MIN_PARALLELISM = 2
+MAX_PARALLELISM = 50
+RESOURCES_PER_WORKER = 4
+PARALLELISM_STEP = 2
+
+REFRESH_MODES = ["full", "fast", "targeted", "scheduled"]
+FULL_REFRESH_INTERVAL = timedelta(hours=24)
+
+THROTTLE_PATTERN = re.compile(
+    r"Throttling|ThrottlingException|Rate exceeded|TooManyRequestsException|RequestLimitExceeded|SlowDown"
+)
+BLOCK_PATTERN = re.compile(r'^\s*(resource|data)\s+"([^"]+)"\s+"([^"]+)"', re.MULTILINE)
+MODULE_PATTERN = re.compile(r'^\s*module\s+"([^"]+)"\s*\{[^}]*?source\s*=\s*"([^"]+)"', re.MULTILINE | re.DOTALL)
+
+def _now():
+    return datetime.now(timezone.utc)
+
+def load_history(env_path):
+    """Load the local record of recent Terraform runs for an environment."""
+    try:
+        with open(shared_env_path(env_path) / HISTORY_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+def record_run(env_path, entry):
+    """Append a run to the history, keeping only the most recent runs."""
+    history_file = shared_env_path(env_path) / HISTORY_FILE
+    # Concurrent runs share one history, so read-modify-write under a lock
+    with open(history_file.with_suffix(".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        history = load_history(env_path)
+        history.append({"at": _now().isoformat(timespec="seconds"), **entry})
+        temp_file = history_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_file, "w") as f:
+            json.dump(history[-HISTORY_LIMIT:], f, indent=2)
+        os.replace(temp_file, history_file)
+        fcntl.flock(lock, fcntl.LOCK_UN)
+
+def recent_runs(env_path, window=HISTORY_WINDOW):
+    """Return runs from the history that are inside the time window."""
+    cutoff = _now() - window
+    return [
+        run for run in load_history(env_path)
+        if datetime.fromisoformat(run["at"]) >= cutoff and run.get("parallelism")
+    ]
+
+def module_dirs(env_path):
+    """Map each module block in an environment to its source directory."""
+    modules = {}
+    for tf_file in sorted(Path(env_path).glob("*.tf")):
+        for name, source in MODULE_PATTERN.findall(tf_file.read_text()):
+            if source.startswith("."):
+                modules[name] = (Path(env_path) / source).resolve()
+    return modules
+
+def count_resources(env_path):
+    """Count resource instances in local state, or declared resources if none."""
+    state_file = Path(env_path) / "terraform.tfstate"
+    try:
+        with open(state_file) as f:
+            state = json.load(f)
+        count = sum(
+            len(resource.get("instances", []))
+            for resource in state.get("resources", [])
+            if resource.get("mode") == "managed"
+        )
+        if count:
+            return count
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+    tf_files = list(Path(env_path).glob("*.tf"))
+    for module_dir in module_dirs(env_path).values():
+        tf_files.extend(module_dir.glob("*.tf"))
+    return sum(
+        1 for tf_file in tf_files
+        for kind, _, _ in BLOCK_PATTERN.findall(tf_file.read_text())
+        if kind == "resource"
+    )
+
+def choose_parallelism(env_path):
+    """Pick -parallelism from the state size and recent throttling.
+
+    Larger states get more workers. A throttled run halves the next run's
+    parallelism, and clean runs step it back up towards the target, never
+    reaching a level that was throttled inside the history window.
+    """
+    resource_count = count_resources(env_path)
+    target = max(DEFAULT_PARALLELISM, min(MAX_PARALLELISM, resource_count // RESOURCES_PER_WORKER))
+
+    runs = recent_runs(env_path)
+    if not runs:
+        return target
+
+    throttled = [run["parallelism"] for run in runs if run.get("throttles")]
+    ceiling = max(MIN_PARALLELISM, min(throttled) - 1) if throttled else target
+
+    last = runs[-1]
+    if last.get("throttles"):
+        return max(MIN_PARALLELISM, last["parallelism"] // 2)
+    return max(MIN_PARALLELISM, min(target, ceiling, last["parallelism"] + PARALLELISM_STEP))
+
+def config_files(env_path):
+    """Map every file an environment's config depends on to a stable key.
+
+    Keys do not depend on where the environment lives, so digests taken
+    in one workspace can be compared with digests from another.
+    """
+    env_path = Path(env_path)
+    files = {tf_file.name: tf_file for tf_file in sorted(env_path.glob("*.tf"))}
+    for module_name, module_dir in module_dirs(env_path).items():
+        for tf_file in sorted(module_dir.glob("*.tf")):
+            files[f"module.{module_name}/{tf_file.name}"] = tf_file
+    files["terraform.tfvars"] = Path("terraform.tfvars")
+    return files
+
+def config_digests(env_path):
+    """Digest every file an environment's config depends on."""
+    return {key: file_digest(path) for key, path in config_files(env_path).items()}
+
+def block_addresses(tf_file):
+    """Return the resource and data source addresses a file declares."""
+    return sorted(
+        f"{resource_type}.{name}" if kind == "resource" else f"data.{resource_type}.{name}"
+        for kind, resource_type, name in BLOCK_PATTERN.findall(Path(tf_file).read_text())
+    )
+
+def config_addresses(env_path):
+    """Map every .tf file of an environment's config to the addresses it declares."""
+    return {key: block_addresses(path) for key, path in config_files(env_path).items() if path.suffix == ".tf"}
+
+def last_applied_run(env_path):
+    """Return the last successful apply that recorded its config, or None."""
+    return next(
+        (run for run in reversed(load_history(env_path))
+         if run.get("command") == "apply" and run.get("returncode") == 0 and run.get("files")),
+        None
+    )
+
+def affected_targets(env_path, baseline=None):
+    """Return -target addresses for resources in files changed since the last apply.
+
+    baseline overrides the run to compare against, as {"files": digests,
+    "addresses": declared addresses}. Returns None when there is no
+    previous apply or the change cannot be narrowed down, meaning a full
+    refresh is needed. That includes a changed file that no longer
+    declares a block it declared at the baseline: -target cannot name a
+    deleted or renamed block, so its destroy would be missed.
+    """
+    baseline = baseline if baseline is not None else last_applied_run(env_path)
+    if baseline is None:
+        print("  → No previous apply to compare against")
+        return None
+    previous, declared = baseline["files"], baseline.get("addresses")
+
+    files = config_files(env_path)
+    current = {key: file_digest(path) for key, path in files.items()}
+    changed = {key for key, digest in current.items() if previous.get(key) != digest}
+    changed |= set(previous) - set(current)
+    if "terraform.tfvars" in changed:
+        print("  → terraform.tfvars changed")
+        return None
+
+    modules = module_dirs(env_path)
+    targets = []
+    for key in sorted(changed):
+        if key not in files:
+            print(f"  → {key} was removed")
+            return None
+        addresses = block_addresses(files[key])
+        if declared is None:
+            print("  → The baseline did not record the addresses its files declared")
+            return None
+        removed = sorted(set(declared.get(key, [])) - set(addresses))
+        if removed:
+            print(f"  → {key} no longer declares {', '.join(removed)}")
+            return None
+        if key.startswith("module."):
+            prefix = key.split("/", 1)[0] + "."
+        else:
+            # Environment-level edits can change any module's inputs
+            prefix = ""
+            targets.extend(f"module.{name}" for name in modules)
+        targets.extend(prefix + address for address in addresses)
+    return sorted(set(targets))
+
+def resolve_refresh_mode(env_path, mode):
+    """Turn the scheduled mode into full or fast based on the last full refresh."""
+    if mode != "scheduled":
+        return mode
+
+    last_full = next(
+        (run for run in reversed(load_history(env_path))
+         if run.get("refresh") == "full" and run.get("returncode") == 0),
+        None
+    )
+    if last_full is None or _now() - datetime.fromisoformat(last_full["at"]) >= FULL_REFRESH_INTERVAL:
+        return "full"
+    return "fast"
+
+def refresh_args(env_path, mode, baseline=None):
+    """Return the plan flags for a refresh mode, and the mode actually used."""
+    mode = resolve_refresh_mode(env_path, mode)
+    if mode == "fast":
+        return ["-refresh=false"], mode
+    if mode == "targeted":
+        targets = affected_targets(env_path, baseline)
+        if targets is None:
+            print("  → Cannot narrow the changes down to resources, using a full refresh")
+            return [], "full"
+        if not targets:
+            print("  → No resources affected by edits, skipping refresh")
+            return ["-refresh=false"], "fast"
+        print(f"  → Refreshing {len(targets)} affected resources")
+        return [f"-target={target}" for target in targets], mode
+    return [], "full"
+
+def plan_command(env_path, mode="full", extra_args=None, baseline=None):
+    """Build a terraform plan command with tuned parallelism and refresh."""
+    parallelism = choose_parallelism(env_path)
+    refresh, mode = refresh_args(env_path, mode, baseline)
+    cmd = [
+        "terraform", "plan",
+        "-var-file=../../terraform.tfvars",
+        f"-parallelism={parallelism}",
+        *refresh,
+        *(extra_args or []),
+        "-out=tfplan"
+    ]
+    return cmd, mode
+
+def apply_command(env_path):
+    """Build a terraform apply command for the saved plan with tuned parallelism."""
+    return ["terraform", "apply", f"-parallelism={choose_parallelism(env_path)}", "tfplan"]
+
+def _parallelism_of(cmd):
+    for arg in cmd:
+        if arg.startswith("-parallelism="):
+            return int(arg.split("=", 1)[1])
+    return DEFAULT_PARALLELISM
+
+def run_terraform(cmd, cwd, refresh=None, quiet=False, check=True, output=None, record=True):
+    """Run terraform, streaming its output and recording throttling and timing.
+
+    Output lines are appended to the output list when one is given. With
+    record=False the run is left out of the history, e.g. for benchmarks.
+    """
+    print(f"  → Running: {' '.join(cmd)}")
+    started = time.monotonic()
+    throttles = 0
+
+    process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    for line in process.stdout:
+        if not quiet:
+            print(line, end="")
+        if output is not None:
+            output.append(line)
+        if THROTTLE_PATTERN.search(line):
+            throttles += 1
+    returncode = process.wait()
+    duration = round(time.monotonic() - started, 2)
+
+    entry = {
+        "command": cmd[1],
+        "parallelism": _parallelism_of(cmd),
+        "refresh": refresh,
+        "throttles": throttles,
+        "duration": duration,
+        "returncode": returncode,
+    }
+    # Only an applied config is a baseline for targeted refresh: a plan
+    # that was never applied did not change any resources
+    if cmd[1] == "apply" and returncode == 0:
+        entry["files"] = config_digests(cwd)
+        entry["addresses"] = config_addresses(cwd)
+    if record:
+        record_run(cwd, entry)
+
+    if throttles:
+        print(f"  ⚠️  {throttles} throttling errors seen, parallelism will be lowered next run")
+
+    if check and returncode != 0:
+        print(f"❌ Command failed: {' '.join(cmd)} returned non-zero exit status {returncode}.")
+        sys.exit(1)
+    return returncode, duration
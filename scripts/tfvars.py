@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+import re
+
+TOKEN_PATTERN = re.compile(r'''
+    (?P<ws>[ \t\r]+|\\\n)
+  | (?P<comment>\#[^\n]*|//[^\n]*|/\*.*?\*/)
+  | (?P<newline>\n)
+  | (?P<string>"(?:[^"\\\n]|\\.)*")
+  | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_-]*)
+  | (?P<punct>[=\[\]{},:])
+''', re.VERBOSE | re.DOTALL)
+
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+
+class TfvarsError(ValueError):
+    """Raised when a tfvars file cannot be parsed."""
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    line = 1
+    while pos < len(text):
+        match = TOKEN_PATTERN.match(text, pos)
+        if not match:
+            raise TfvarsError(f"line {line}: unexpected character {text[pos]!r}")
+        kind = match.lastgroup
+        value = match.group()
+        if kind == "newline":
+            tokens.append(("newline", value, line))
+        elif kind not in ("ws", "comment"):
+            tokens.append((kind, value, line))
+        line += value.count("\n")
+        pos = match.end()
+    tokens.append(("eof", "", line))
+    return tokens
+
+def _unquote(value, line):
+    if "${" in value or "%{" in value:
+        raise TfvarsError(f"line {line}: template expressions are not allowed in tfvars")
+    body = value[1:-1]
+    return re.sub(r"\\(u[0-9a-fA-F]{4}|.)", lambda m: (
+        chr(int(m.group(1)[1:], 16)) if m.group(1).startswith("u") else ESCAPES.get(m.group(1), m.group(1))
+    ), body)
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self, skip_newlines=True):
+        while skip_newlines and self.tokens[self.pos][0] == "newline":
+            self.pos += 1
+        return self.tokens[self.pos]
+
+    def take(self, kind=None, value=None, skip_newlines=True):
+        token = self.peek(skip_newlines)
+        if (kind and token[0] != kind) or (value and token[1] != value):
+            expected = value or kind
+            raise TfvarsError(f"line {token[2]}: expected {expected}, got {token[1] or 'end of file'!r}")
+        self.pos += 1
+        return token
+
+    def parse_file(self):
+        values = {}
+        while self.peek()[0] != "eof":
+            _, name, line = self.take("ident")
+            self.take("punct", "=")
+            if name in values:
+                raise TfvarsError(f"line {line}: {name} is defined more than once")
+            values[name] = self.parse_value()
+            token = self.peek(skip_newlines=False)
+            if token[0] not in ("newline", "eof"):
+                raise TfvarsError(f"line {token[2]}: expected a new line after {name}")
+        return values
+
+    def parse_value(self):
+        kind, value, line = self.take()
+        if kind == "string":
+            return _unquote(value, line)
+        if kind == "number":
+            return float(value) if any(c in value for c in ".eE") else int(value)
+        if kind == "ident" and value in ("true", "false"):
+            return value == "true"
+        if kind == "ident" and value == "null":
+            return None
+        if value == "[":
+            return self.parse_list()
+        if value == "{":
+            return self.parse_object()
+        raise TfvarsError(f"line {line}: unsupported value {value!r}")
+
+    def parse_list(self):
+        items = []
+        while self.peek()[1] != "]":
+            items.append(self.parse_value())
+            if self.peek()[1] == ",":
+                self.take()
+            elif self.peek()[1] != "]":
+                raise TfvarsError(f"line {self.peek()[2]}: expected , or ]")
+        self.take("punct", "]")
+        return items
+
+    def parse_object(self):
+        items = {}
+        while self.peek()[1] != "}":
+            kind, key, line = self.take()
+            if kind == "string":
+                key = _unquote(key, line)
+            elif kind != "ident":
+                raise TfvarsError(f"line {line}: expected an object key, got {key!r}")
+            separator = self.take("punct")
+            if separator[1] not in ("=", ":"):
+                raise TfvarsError(f"line {separator[2]}: expected = after {key}")
+            items[key] = self.parse_value()
+            if self.peek()[1] == ",":
+                self.take()
+        self.take("punct", "}")
+        return items
+
+def parse_tfvars(text):
+    """Parse the contents of a .tfvars file into a dict of variable values."""
+    return _Parser(text).parse_file()
+
+def load_tfvars(file_path="terraform.tfvars"):
+    """Read and parse a .tfvars file."""
+    with open(file_path) as f:
+        return parse_tfvars(f.read())
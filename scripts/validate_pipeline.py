@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 import json
-import boto3
 import sys
+import argparse
 from pathlib import Path
-from botocore.exceptions import ClientError, NoCredentialsError
+
+from step_journal import file_digest
+from validation_cache import DEFAULT_TTL, forget, is_cached, load_cache, output_digest, record_pass, save_cache
 
 def load_outputs():
     """Load outputs from all phases."""
@@ -23,8 +25,16 @@ def load_outputs():
         print(f"❌ Error: Invalid JSON in outputs: {e}")
         sys.exit(1)
 
-def test_tooling_account_access(tooling_outputs):
+def tooling_arn(tooling_outputs, service, resource):
+    """Build the ARN of a tooling resource, in the region and account of the KMS key."""
+    _, partition, _, region, account, _ = tooling_outputs['kms_key_arn']['value'].split(':', 5)
+    return f"arn:{partition}:{service}:{region}:{account}:{resource}"
+
+def test_tooling_account_access(tooling_outputs, cache, ttl):
     """Test access to resources in tooling account."""
+    import boto3
+    from botocore.exceptions import ClientError, NoCredentialsError
+
     print("🔍 Testing Tooling Account Resources...")
     
     try:
@@ -32,53 +42,77 @@ def test_tooling_account_access(tooling_outputs):
         session = boto3.Session(profile_name='tooling')
         
         # Test S3 bucket access
-        s3_client = session.client('s3')
         bucket_name = tooling_outputs['artifact_bucket_name']['value']
+        bucket_arn = tooling_outputs['artifact_bucket_arn']['value']
+        digest = output_digest(bucket_name)
         
         print(f"  → Testing S3 bucket: {bucket_name}")
-        try:
-            s3_client.head_bucket(Bucket=bucket_name)
-            print("    ✅ S3 bucket accessible")
-        except ClientError as e:
-            print(f"    ❌ S3 bucket access failed: {e}")
-            return False
+        if is_cached(cache, "s3:HeadBucket", bucket_arn, digest, ttl):
+            print("    ✅ S3 bucket accessible (cached)")
+        else:
+            try:
+                session.client('s3').head_bucket(Bucket=bucket_name)
+                record_pass(cache, "s3:HeadBucket", bucket_arn, digest)
+                print("    ✅ S3 bucket accessible")
+            except ClientError as e:
+                forget(cache, "s3:HeadBucket", bucket_arn)
+                print(f"    ❌ S3 bucket access failed: {e}")
+                return False
         
         # Test KMS key access
-        kms_client = session.client('kms')
         kms_key_arn = tooling_outputs['kms_key_arn']['value']
         kms_key_id = kms_key_arn.split('/')[-1]
+        digest = output_digest(kms_key_arn)
         
         print(f"  → Testing KMS key: {kms_key_id}")
-        try:
-            kms_client.describe_key(KeyId=kms_key_id)
-            print("    ✅ KMS key accessible")
-        except ClientError as e:
-            print(f"    ❌ KMS key access failed: {e}")
-            return False
+        if is_cached(cache, "kms:DescribeKey", kms_key_arn, digest, ttl):
+            print("    ✅ KMS key accessible (cached)")
+        else:
+            try:
+                session.client('kms').describe_key(KeyId=kms_key_id)
+                record_pass(cache, "kms:DescribeKey", kms_key_arn, digest)
+                print("    ✅ KMS key accessible")
+            except ClientError as e:
+                forget(cache, "kms:DescribeKey", kms_key_arn)
+                print(f"    ❌ KMS key access failed: {e}")
+                return False
         
         # Test CodeCommit repository
-        codecommit_client = session.client('codecommit')
-        repo_name = tooling_outputs['repository_clone_url']['value'].split('/')[-1].replace('.git', '')
+        clone_url = tooling_outputs['repository_clone_url']['value']
+        repo_name = clone_url.split('/')[-1].replace('.git', '')
+        repo_arn = tooling_arn(tooling_outputs, "codecommit", repo_name)
+        digest = output_digest(clone_url)
         
         print(f"  → Testing CodeCommit repository: {repo_name}")
-        try:
-            codecommit_client.get_repository(repositoryName=repo_name)
-            print("    ✅ CodeCommit repository accessible")
-        except ClientError as e:
-            print(f"    ❌ CodeCommit repository access failed: {e}")
-            return False
+        if is_cached(cache, "codecommit:GetRepository", repo_arn, digest, ttl):
+            print("    ✅ CodeCommit repository accessible (cached)")
+        else:
+            try:
+                session.client('codecommit').get_repository(repositoryName=repo_name)
+                record_pass(cache, "codecommit:GetRepository", repo_arn, digest)
+                print("    ✅ CodeCommit repository accessible")
+            except ClientError as e:
+                forget(cache, "codecommit:GetRepository", repo_arn)
+                print(f"    ❌ CodeCommit repository access failed: {e}")
+                return False
         
         # Test CodePipeline
-        codepipeline_client = session.client('codepipeline')
         pipeline_name = tooling_outputs['pipeline_name']['value']
+        pipeline_arn = tooling_arn(tooling_outputs, "codepipeline", pipeline_name)
+        digest = output_digest(pipeline_name)
         
         print(f"  → Testing CodePipeline: {pipeline_name}")
-        try:
-            codepipeline_client.get_pipeline(name=pipeline_name)
-            print("    ✅ CodePipeline accessible")
-        except ClientError as e:
-            print(f"    ❌ CodePipeline access failed: {e}")
-            return False
+        if is_cached(cache, "codepipeline:GetPipeline", pipeline_arn, digest, ttl):
+            print("    ✅ CodePipeline accessible (cached)")
+        else:
+            try:
+                session.client('codepipeline').get_pipeline(name=pipeline_name)
+                record_pass(cache, "codepipeline:GetPipeline", pipeline_arn, digest)
+                print("    ✅ CodePipeline accessible")
+            except ClientError as e:
+                forget(cache, "codepipeline:GetPipeline", pipeline_arn)
+                print(f"    ❌ CodePipeline access failed: {e}")
+                return False
         
         return True
         
@@ -90,8 +124,45 @@ def test_tooling_account_access(tooling_outputs):
         print(f"❌ Error testing tooling account: {e}")
         return False
 
-def test_prod_account_access(prod_outputs):
+def check_role_policies(iam_client, role_arn, label, cache, ttl):
+    """Check that a prod role exists and report its inline policies."""
+    from botocore.exceptions import ClientError
+
+    role_name = role_arn.split('/')[-1]
+    # A deploy changes the state, which invalidates the cached policy count
+    digest = output_digest(role_arn, file_digest("environments/prod/terraform.tfstate"))
+    
+    print(f"  → Testing {label} role: {role_name}")
+    if is_cached(cache, "iam:GetRole+ListRolePolicies", role_arn, digest, ttl):
+        print(f"    ✅ {label} role exists (cached)")
+        print("    ✅ Role has inline policies (cached)")
+        return True
+
+    try:
+        iam_client.get_role(RoleName=role_name)
+        print(f"    ✅ {label} role exists")
+        
+        # Check if role has policies
+        policies = iam_client.list_role_policies(RoleName=role_name)
+        if policies['PolicyNames']:
+            print(f"    ✅ Role has {len(policies['PolicyNames'])} inline policies")
+            record_pass(cache, "iam:GetRole+ListRolePolicies", role_arn, digest)
+        else:
+            # Not cached: Phase 3 may attach the policies at any moment
+            print("    ⚠️  Role has no inline policies (Phase 3 might not be complete)")
+            
+    except ClientError as e:
+        forget(cache, "iam:GetRole+ListRolePolicies", role_arn)
+        print(f"    ❌ {label} role access failed: {e}")
+        return False
+
+    return True
+
+def test_prod_account_access(prod_outputs, cache, ttl):
     """Test access to resources in prod account."""
+    import boto3
+    from botocore.exceptions import NoCredentialsError
+
     print("\n🔍 Testing Production Account Resources...")
     
     try:
@@ -100,43 +171,11 @@ def test_prod_account_access(prod_outputs):
         iam_client = session.client('iam')
         
         # Test CodePipeline role
-        codepipeline_role_arn = prod_outputs['codepipeline_role_arn']['value']
-        role_name = codepipeline_role_arn.split('/')[-1]
-        
-        print(f"  → Testing CodePipeline role: {role_name}")
-        try:
-            role = iam_client.get_role(RoleName=role_name)
-            print("    ✅ CodePipeline role exists")
-            
-            # Check if role has policies
-            policies = iam_client.list_role_policies(RoleName=role_name)
-            if policies['PolicyNames']:
-                print(f"    ✅ Role has {len(policies['PolicyNames'])} inline policies")
-            else:
-                print("    ⚠️  Role has no inline policies (Phase 3 might not be complete)")
-                
-        except ClientError as e:
-            print(f"    ❌ CodePipeline role access failed: {e}")
+        if not check_role_policies(iam_client, prod_outputs['codepipeline_role_arn']['value'], "CodePipeline", cache, ttl):
             return False
         
         # Test CloudFormation role
-        cf_role_arn = prod_outputs['cloudformation_role_arn']['value']
-        cf_role_name = cf_role_arn.split('/')[-1]
-        
-        print(f"  → Testing CloudFormation role: {cf_role_name}")
-        try:
-            role = iam_client.get_role(RoleName=cf_role_name)
-            print("    ✅ CloudFormation role exists")
-            
-            # Check if role has policies
-            policies = iam_client.list_role_policies(RoleName=cf_role_name)
-            if policies['PolicyNames']:
-                print(f"    ✅ Role has {len(policies['PolicyNames'])} inline policies")
-            else:
-                print("    ⚠️  Role has no inline policies (Phase 3 might not be complete)")
-                
-        except ClientError as e:
-            print(f"    ❌ CloudFormation role access failed: {e}")
+        if not check_role_policies(iam_client, prod_outputs['cloudformation_role_arn']['value'], "CloudFormation", cache, ttl):
             return False
         
         return True
@@ -149,9 +188,28 @@ def test_prod_account_access(prod_outputs):
         print(f"❌ Error testing prod account: {e}")
         return False
 
-def test_cross_account_permissions(prod_outputs, tooling_outputs):
+def test_cross_account_permissions(prod_outputs, tooling_outputs, cache, ttl):
     """Test cross-account permissions by attempting to assume roles."""
+    import boto3
+    from botocore.exceptions import ClientError
+
     print("\n🔗 Testing Cross-Account Permissions...")
+
+    codepipeline_role_arn = prod_outputs['codepipeline_role_arn']['value']
+    bucket_name = tooling_outputs['artifact_bucket_name']['value']
+    # Depends on the Phase 3 role policies and the bucket policy, so a
+    # deploy of either environment invalidates the cached pass
+    digest = output_digest(
+        codepipeline_role_arn, bucket_name,
+        file_digest("environments/prod/terraform.tfstate"),
+        file_digest("environments/tooling/terraform.tfstate"),
+    )
+    if is_cached(cache, "sts:AssumeRole+s3:HeadBucket", codepipeline_role_arn, digest, ttl):
+        print(f"  → Testing assume role: {codepipeline_role_arn.split('/')[-1]}")
+        print("    ✅ Successfully assumed CodePipeline role (cached)")
+        print("    ✅ Cross-account S3 access working (cached)")
+        return True
+    forget(cache, "sts:AssumeRole+s3:HeadBucket", codepipeline_role_arn)
     
     try:
         # Test from tooling account - can we assume prod roles?
@@ -159,7 +217,6 @@ def test_cross_account_permissions(prod_outputs, tooling_outputs):
         sts_client = tooling_session.client('sts')
         
         # Test assuming CodePipeline role
-        codepipeline_role_arn = prod_outputs['codepipeline_role_arn']['value']
         print(f"  → Testing assume role: {codepipeline_role_arn.split('/')[-1]}")
         
         try:
@@ -178,9 +235,9 @@ def test_cross_account_permissions(prod_outputs, tooling_outputs):
                 aws_session_token=assumed_credentials['SessionToken']
             )
             
-            bucket_name = tooling_outputs['artifact_bucket_name']['value']
             try:
                 s3_client.head_bucket(Bucket=bucket_name)
+                record_pass(cache, "sts:AssumeRole+s3:HeadBucket", codepipeline_role_arn, digest)
                 print("    ✅ Cross-account S3 access working")
             except ClientError as e:
                 print(f"    ❌ Cross-account S3 access failed: {e}")
@@ -230,16 +287,29 @@ def display_summary(tooling_ok, prod_ok, cross_account_ok):
             print("  - Check IAM role trust relationships")
 
 def main():
+    parser = argparse.ArgumentParser(description="Validate the cross-account pipeline")
+    parser.add_argument(
+        "--force", action="store_true",
+        help="ignore cached results and re-check every resource"
+    )
+    parser.add_argument(
+        "--ttl", type=int, default=DEFAULT_TTL,
+        help=f"seconds a passed check stays cached (default: {DEFAULT_TTL})"
+    )
+    args = parser.parse_args()
+
     print("🔍 Cross-Account CI/CD Pipeline Validation")
     print("=" * 45)
     
     # Load outputs
     prod_outputs, tooling_outputs = load_outputs()
+    cache = load_cache(force=args.force)
     
     # Run tests
-    tooling_ok = test_tooling_account_access(tooling_outputs)
-    prod_ok = test_prod_account_access(prod_outputs)
-    cross_account_ok = test_cross_account_permissions(prod_outputs, tooling_outputs) if tooling_ok and prod_ok else False
+    tooling_ok = test_tooling_account_access(tooling_outputs, cache, args.ttl)
+    prod_ok = test_prod_account_access(prod_outputs, cache, args.ttl)
+    cross_account_ok = test_cross_account_permissions(prod_outputs, tooling_outputs, cache, args.ttl) if tooling_ok and prod_ok else False
+    save_cache(cache)
     
     # Display summary
     display_summary(tooling_ok, prod_ok, cross_account_ok)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import os
+import json
+import fcntl
+import time
+import hashlib
+from pathlib import Path
+
+CACHE_FILE = Path(".validation_cache.json")
+DEFAULT_TTL = 600
+
+def output_digest(*values):
+    """Digest the output values a check depends on."""
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()
+
+def _read_cache():
+    try:
+        with open(CACHE_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def load_cache(force=False):
+    """Load cached validation results; --force ignores them for this run."""
+    return {} if force else _read_cache()
+
+def save_cache(cache):
+    """Merge this run's results into the cache file and write it atomically.
+
+    Both validation scripts share the file, so it is re-read under a lock
+    and only the entries this run passed or forgot are changed. Entries
+    that have no chance of being used are dropped.
+    """
+    with open(CACHE_FILE.with_suffix(".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        merged = _read_cache()
+        for key, entry in cache.items():
+            if entry is None:
+                merged.pop(key, None)
+            elif key not in merged or merged[key]["checked_at"] <= entry["checked_at"]:
+                merged[key] = entry
+        now = time.time()
+        merged = {key: entry for key, entry in merged.items() if now - entry["checked_at"] < 24 * 3600}
+        temp_file = CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_file, "w") as f:
+            json.dump(merged, f, indent=2)
+        os.replace(temp_file, CACHE_FILE)
+        fcntl.flock(lock, fcntl.LOCK_UN)
+
+def is_cached(cache, check, resource_arn, digest, ttl):
+    """Check whether a check last passed for this resource and digest within the TTL."""
+    entry = cache.get(f"{check}|{resource_arn}")
+    return (
+        entry is not None
+        and entry["digest"] == digest
+        and time.time() - entry["checked_at"] < ttl
+    )
+
+def record_pass(cache, check, resource_arn, digest):
+    """Remember that a check passed. Failures are never cached."""
+    cache[f"{check}|{resource_arn}"] = {"digest": digest, "checked_at": time.time()}
+
+def forget(cache, check, resource_arn):
+    """Drop a cached pass, e.g. when the same check now fails."""
+    # Kept as a marker so save_cache also drops it from the file
+    cache[f"{check}|{resource_arn}"] = None
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+import sys
+import json
+import time
+import argparse
+
+STATUS_ICONS = {
+    "InProgress": "⏳",
+    "Succeeded": "✅",
+    "Failed": "❌",
+    "Stopped": "⏹️ ",
+    "Stopping": "⏹️ ",
+    "Superseded": "⏭️ ",
+    "Cancelled": "⏹️ ",
+    "Abandoned": "⏹️ ",
+}
+FINAL_STATUSES = {"Succeeded", "Failed", "Stopped", "Superseded", "Cancelled"}
+
+def load_pipeline_name():
+    """Read the pipeline name from the Phase 2 outputs."""
+    try:
+        with open("environments/tooling/outputs.json") as f:
+            return json.load(f)["pipeline_name"]["value"]
+    except (FileNotFoundError, KeyError, json.JSONDecodeError) as e:
+        print(f"❌ Error: Could not read pipeline name from tooling outputs: {e}")
+        print("   Run Phase 2 first: python scripts/deploy_phase2_pipeline.py")
+        sys.exit(1)
+
+def stage_statuses(state):
+    """Map each stage to the status and execution ID of its latest run."""
+    statuses = {}
+    for stage in state.get("stageStates", []):
+        latest = stage.get("latestExecution", {})
+        statuses[stage["stageName"]] = (latest.get("status"), latest.get("pipelineExecutionId"))
+    return statuses
+
+def watch_pipeline(pipeline_name, interval, timeout):
+    """Poll the pipeline and print stage changes until its execution finishes."""
+    import boto3
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    client = boto3.Session(profile_name="tooling").client("codepipeline")
+    deadline = time.monotonic() + timeout
+    seen = {}
+
+    try:
+        executions = client.list_pipeline_executions(pipelineName=pipeline_name, maxResults=1)
+        if not executions["pipelineExecutionSummaries"]:
+            print("  ⚠️  Pipeline has no executions yet")
+            return None
+        execution_id = executions["pipelineExecutionSummaries"][0]["pipelineExecutionId"]
+        print(f"  → Watching execution {execution_id}")
+
+        while time.monotonic() < deadline:
+            state = client.get_pipeline_state(name=pipeline_name)
+            for stage, (status, stage_execution) in stage_statuses(state).items():
+                if stage_execution == execution_id and seen.get(stage) != status:
+                    seen[stage] = status
+                    print(f"  {STATUS_ICONS.get(status, '•')} {stage}: {status}")
+
+            execution = client.get_pipeline_execution(
+                pipelineName=pipeline_name, pipelineExecutionId=execution_id
+            )["pipelineExecution"]
+            if execution["status"] in FINAL_STATUSES:
+                return execution["status"]
+            time.sleep(interval)
+
+    except (BotoCoreError, ClientError) as e:
+        print(f"❌ Error watching pipeline: {e}")
+        sys.exit(1)
+
+    print(f"  ⚠️  Timed out after {timeout}s")
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch the latest pipeline execution")
+    parser.add_argument("--interval", type=int, default=10, help="seconds between polls (default: 10)")
+    parser.add_argument("--timeout", type=int, default=3600, help="give up after this many seconds")
+    args = parser.parse_args()
+
+    pipeline_name = load_pipeline_name()
+    print(f"👀 Watching pipeline: {pipeline_name}")
+    print("=" * 45)
+
+    status = watch_pipeline(pipeline_name, args.interval, args.timeout)
+    if status == "Succeeded":
+        print("\n🎉 Pipeline execution succeeded!")
+    else:
+        print(f"\n❌ Pipeline execution finished with status: {status or 'unknown'}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
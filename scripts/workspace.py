@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import fcntl
+import shutil
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+WORKSPACES_DIR = Path(".workspaces")
+MARKER_FILE = ".workspace.json"
+LOCK_FILE = ".state.lock"
+
+# Shared with the checkout: state and provider cache are guarded by the
+# environment lock, everything else in a workspace belongs to one run
+SHARED_ENV_FILES = ["terraform.tfstate", "terraform.tfstate.backup", ".terraform", ".terraform.lock.hcl"]
+
+def _link(link_path, target):
+    if link_path.is_symlink() or link_path.exists():
+        return
+    link_path.symlink_to(target)
+
+def create_workspace(env_name, name=None, links=None):
+    """Create, or reopen, an isolated scratch copy of an environment.
+
+    The workspace mirrors the checkout layout so relative module sources
+    keep working. The environment's .tf files are copied, so a run can
+    rewrite them; modules, tfvars, state and the provider cache are
+    symlinked to the checkout. links maps file names in the workspace to
+    other targets, e.g. a different state file. Returns the workspace
+    environment path.
+    """
+    name = name or f"{env_name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    repo = Path.cwd().resolve()
+    source = repo / "environments" / env_name
+    root = (WORKSPACES_DIR / name).resolve()
+    env_path = root / "environments" / env_name
+    env_path.mkdir(parents=True, exist_ok=True)
+
+    _link(root / "modules", repo / "modules")
+    _link(root / "terraform.tfvars", repo / "terraform.tfvars")
+
+    # Other environments are only read, e.g. tooling reads ../prod/outputs.json
+    for other in (repo / "environments").iterdir():
+        if other.is_dir() and other.name != env_name:
+            (root / "environments" / other.name).mkdir(exist_ok=True)
+            _link(root / "environments" / other.name / "outputs.json", other / "outputs.json")
+
+    (source / ".terraform").mkdir(exist_ok=True)
+    for file_name, target in (links or {}).items():
+        _link(env_path / file_name, Path(target).resolve())
+    for shared in SHARED_ENV_FILES:
+        _link(env_path / shared, source / shared)
+
+    marker = env_path / MARKER_FILE
+    if not marker.exists():
+        for tf_file in source.glob("*.tf"):
+            shutil.copy2(tf_file, env_path / tf_file.name)
+        with open(marker, "w") as f:
+            json.dump({
+                "env": env_name,
+                "source": str(source),
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }, f, indent=2)
+
+    return env_path
+
+def shared_env_path(env_path):
+    """Return the checkout environment a workspace was created from."""
+    marker = Path(env_path) / MARKER_FILE
+    if marker.exists():
+        with open(marker) as f:
+            return Path(json.load(f)["source"])
+    return Path(env_path)
+
+def find_workspaces(env_name):
+    """Return the workspaces for an environment, newest first."""
+    if not WORKSPACES_DIR.is_dir():
+        return []
+    env_paths = [
+        root.resolve() / "environments" / env_name
+        for root in WORKSPACES_DIR.iterdir()
+        if (root / "environments" / env_name / MARKER_FILE).exists()
+    ]
+    return sorted(env_paths, key=lambda p: (p / MARKER_FILE).stat().st_mtime, reverse=True)
+
+def remove_workspace(env_path):
+    """Delete a workspace; symlinked shared files are unlinked, not followed."""
+    root = Path(env_path).parent.parent
+    if root.parent.resolve() == WORKSPACES_DIR.resolve():
+        shutil.rmtree(root)
+
+@contextmanager
+def env_lock(env_path, exclusive=True):
+    """Hold an advisory lock on an environment's shared state.
+
+    Deploys take the lock exclusively; read-only commands take it shared,
+    so they can run next to each other but not during an apply.
+    """
+    lock_path = shared_env_path(env_path) / LOCK_FILE
+    mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+    with open(lock_path, "a") as lock:
+        try:
+            fcntl.flock(lock, mode | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print(f"  → Waiting for another run to release {lock_path}...")
+            started = time.monotonic()
+            fcntl.flock(lock, mode)
+            print(f"  → Lock acquired after {time.monotonic() - started:.0f}s")
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def publish(env_path, file_name):
+    """Copy a file from a workspace into the checkout environment atomically.
+
+    The caller must hold the exclusive environment lock.
+    """
+    source = Path(env_path) / file_name
+    target = shared_env_path(env_path) / file_name
+    if source.resolve() == target.resolve():
+        return
+    temp_file = target.with_name(f".{file_name}.{os.getpid()}.tmp")
+    shutil.copy2(source, temp_file)
+    os.replace(temp_file, target)